@@ -0,0 +1,25 @@
+"""add event_date index
+
+Revision ID: 8c1f4e2b7d90
+Revises: ae88f89c861d
+Create Date: 2026-10-18 12:04:51.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4e2b7d90'
+down_revision: Union[str, None] = 'ae88f89c861d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_articles_event_date', 'articles', ['event_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_event_date', table_name='articles')
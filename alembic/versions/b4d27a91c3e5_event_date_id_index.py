@@ -0,0 +1,27 @@
+"""event_date id index
+
+Revision ID: b4d27a91c3e5
+Revises: 8c1f4e2b7d90
+Create Date: 2026-10-18 13:22:07.906114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d27a91c3e5'
+down_revision: Union[str, None] = '8c1f4e2b7d90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_articles_event_date_id', 'articles', ['event_date', 'id'], unique=False)
+    op.drop_index('ix_articles_event_date', table_name='articles')
+
+
+def downgrade() -> None:
+    op.create_index('ix_articles_event_date', 'articles', ['event_date'], unique=False)
+    op.drop_index('ix_articles_event_date_id', table_name='articles')
@@ -0,0 +1,32 @@
+"""add brs probe states
+
+Revision ID: c7e2a9d41b38
+Revises: f1a9c3d5e7b2
+Create Date: 2026-10-18 18:12:04.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a9d41b38'
+down_revision: Union[str, None] = 'f1a9c3d5e7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'brs_probe_states',
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('session_num', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('brs_probe_states')
@@ -0,0 +1,29 @@
+"""add brs fingerprints
+
+Revision ID: d2b8e5f07a61
+Revises: c7e2a9d41b38
+Create Date: 2026-10-18 19:03:41.572930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b8e5f07a61'
+down_revision: Union[str, None] = 'c7e2a9d41b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_TABLES = ('teachers', 'subjects', 'stud_groups', 'curriculum_units')
+
+
+def upgrade() -> None:
+    for table in SYNCED_TABLES:
+        op.add_column(table, sa.Column('brs_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    for table in SYNCED_TABLES:
+        op.drop_column(table, 'brs_fingerprint')
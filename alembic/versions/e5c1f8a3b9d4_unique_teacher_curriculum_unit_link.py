@@ -0,0 +1,41 @@
+"""unique teacher curriculum unit link
+
+Revision ID: e5c1f8a3b9d4
+Revises: d2b8e5f07a61
+Create Date: 2026-10-18 19:41:26.804117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c1f8a3b9d4'
+down_revision: Union[str, None] = 'd2b8e5f07a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE teacher_curriculum_unit_link SET is_practice = false WHERE is_practice IS NULL")
+    # Оставляем по одной связи из каждой группы дублей
+    op.execute("""
+        DELETE FROM teacher_curriculum_unit_link link
+        USING teacher_curriculum_unit_link duplicate
+        WHERE link.teacher_id = duplicate.teacher_id
+          AND link.curriculum_unit_id = duplicate.curriculum_unit_id
+          AND link.is_practice = duplicate.is_practice
+          AND link.id > duplicate.id
+    """)
+    op.alter_column('teacher_curriculum_unit_link', 'is_practice', existing_type=sa.Boolean(), nullable=False)
+    op.create_unique_constraint(
+        'uq_teacher_curriculum_unit_link',
+        'teacher_curriculum_unit_link',
+        ['teacher_id', 'curriculum_unit_id', 'is_practice']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_teacher_curriculum_unit_link', 'teacher_curriculum_unit_link', type_='unique')
+    op.alter_column('teacher_curriculum_unit_link', 'is_practice', existing_type=sa.Boolean(), nullable=True)
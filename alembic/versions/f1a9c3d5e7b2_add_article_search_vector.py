@@ -0,0 +1,38 @@
+"""add article search vector
+
+Revision ID: f1a9c3d5e7b2
+Revises: b4d27a91c3e5
+Create Date: 2026-10-18 14:47:30.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a9c3d5e7b2'
+down_revision: Union[str, None] = 'b4d27a91c3e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('articles', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(content, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index('ix_articles_search_vector', 'articles', ['search_vector'], unique=False,
+                    postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_search_vector', table_name='articles', postgresql_using='gin')
+    op.drop_column('articles', 'search_vector')
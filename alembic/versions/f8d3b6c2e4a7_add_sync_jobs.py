@@ -0,0 +1,39 @@
+"""add sync jobs
+
+Revision ID: f8d3b6c2e4a7
+Revises: e5c1f8a3b9d4
+Create Date: 2026-10-18 20:26:53.190442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8d3b6c2e4a7'
+down_revision: Union[str, None] = 'e5c1f8a3b9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('phase', sa.String(), nullable=True),
+        sa.Column('stats', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('timings', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('error', sa.TEXT(), nullable=True),
+        sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_jobs_status', 'sync_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_jobs_status', table_name='sync_jobs')
+    op.drop_table('sync_jobs')
@@ -1,6 +1,20 @@
 from datetime import datetime, date
-from pydantic import BaseModel
+from enum import Enum
+from pydantic import BaseModel, computed_field
 from typing import List
+from app.dao.enums import MonthFilterMode  # реэкспорт: режим фильтра по месяцам нужен и API, и DAO
+from app.service.common.images import icon_renditions
+
+
+class IconRenditionsMixin(BaseModel):
+    """
+    Добавляет в ответ URL всех версий иконки (thumb, card, full) в WebP и запасном формате.
+    """
+
+    @computed_field
+    @property
+    def icon_renditions(self) -> dict[str, dict[str, str]] | None:
+        return icon_renditions(self.icon)
 
 
 class TeacherBase(BaseModel):
@@ -22,7 +36,7 @@ class TeacherBase(BaseModel):
     brs_id: int
 
 
-class TeacherResponse(TeacherBase):
+class TeacherResponse(IconRenditionsMixin, TeacherBase):
     """
     DTO для ответа с данными учителя (GET-запросы).
     """
@@ -55,7 +69,7 @@ class TagResponse(TagBase):
     id: int
 
 
-class ArticleResponse(ArticleBase):
+class ArticleResponse(IconRenditionsMixin, ArticleBase):
     """
     DTO-шка для получения всех статей
     """
@@ -65,7 +79,37 @@ class ArticleResponse(ArticleBase):
     event_date: date
 
 
-class ArticleLatestResponse(BaseModel):
+class ArticleView(str, Enum):
+    """
+    Вид статей в списке: full — с полным текстом, summary — без текста, с коротким отрывком.
+    """
+    full = "full"
+    summary = "summary"
+
+
+class ArticleSummaryResponse(IconRenditionsMixin):
+    """
+    DTO-шка для списка статей без полного текста
+    """
+    id: int
+    icon: str
+    title: str
+    tag_ids: list[int]
+    event_date: date
+    created_at: datetime
+    views: int
+    excerpt: str | None = None
+
+
+class ArticlePage(BaseModel):
+    """
+    Страница статей и курсор для запроса следующей страницы
+    """
+    items: list[ArticleResponse | ArticleSummaryResponse]
+    next_cursor: str | None = None
+
+
+class ArticleLatestResponse(IconRenditionsMixin):
     """
     DTO-шка для получения последних 6 статей
     """
@@ -76,6 +120,38 @@ class ArticleLatestResponse(BaseModel):
     event_date: date
 
 
+class ArticlePopularResponse(ArticleLatestResponse):
+    """
+    DTO-шка для получения самых просматриваемых статей
+    """
+    views: int
+
+
+class TagFacet(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class MonthFacet(BaseModel):
+    month: int
+    count: int
+
+
+class YearFacet(BaseModel):
+    year: int
+    count: int
+    months: list[MonthFacet]
+
+
+class ArticleFacetsResponse(BaseModel):
+    """
+    DTO-шка с количеством статей по тегам, годам и месяцам для боковой панели архива
+    """
+    tags: list[TagFacet]
+    years: list[YearFacet]
+
+
 class CurriculumUnitResponse(BaseModel):
     id: int
     practice_teacher_brs_ids: list[int]
@@ -118,6 +194,20 @@ class SubjectWithPracticeResponse(SubjectResponse):
     is_practice: bool
 
 
+class SyncJobResponse(BaseModel):
+    """
+    DTO-шка задачи полной синхронизации: статус, текущая фаза, число строк по таблицам и длительность фаз в секундах
+    """
+    id: int
+    status: str
+    phase: str | None
+    stats: dict[str, dict[str, int]] | None
+    timings: dict[str, float]
+    error: str | None
+    started_at: datetime
+    finished_at: datetime | None
+
+
 class AdminRegisterRequest(BaseModel):
     username: str
     password: str
@@ -0,0 +1,49 @@
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+from app.service.common.metrics import metrics
+
+# Запас на остальные поля формы (заголовок, текст статьи и т.п.) сверх размера самого файла
+FORM_FIELDS_ALLOWANCE = 1024 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Ограничивает размер multipart-запросов ещё до разбора формы: по Content-Length сразу,
+    а при потоковой передаче — как только получено больше `max_body_size` байт.
+    """
+
+    def __init__(self, app: ASGIApp, max_upload_size: int):
+        self.app = app
+        self.max_body_size = max_upload_size + FORM_FIELDS_ALLOWANCE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_size:
+            metrics.increment("icon_upload.rejected")
+            response = JSONResponse({"detail": "Request body is too large."}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    metrics.increment("icon_upload.rejected")
+                    raise HTTPException(status_code=413, detail="Request body is too large.")
+            return message
+
+        await self.app(scope, limited_receive, send)
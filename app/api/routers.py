@@ -1,20 +1,24 @@
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Path, Form, UploadFile, Query, File
+from fastapi import APIRouter, Depends, HTTPException, Path, Form, UploadFile, Query, File, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app.api.dto import TeacherBase, TeacherResponse, TagResponse, TagBase, ArticleResponse, ArticleBase, \
     ArticleLatestResponse, CurriculumUnitResponse, SubjectResponse, StudGroupResponse, CurriculumUnitFullResponse, \
-    TeacherWithPracticeResponse, SubjectWithPracticeResponse, AdminRegisterRequest
+    TeacherWithPracticeResponse, SubjectWithPracticeResponse, AdminRegisterRequest, MonthFilterMode, \
+    ArticlePopularResponse, ArticleView, ArticleSummaryResponse, ArticleFacetsResponse, SyncJobResponse
 from app.config.config import settings
 from app.providers import get_teacher_service, get_tag_service, get_article_service, get_curriculum_unit_service, \
-    get_subject_service, get_stud_group_service, get_data_sync_manager, get_admin_user_service
+    get_subject_service, get_stud_group_service, get_sync_job_service, get_admin_user_service
 from app.service.article_service import ArticleService
 from app.service.auth_service import AdminUserService
-from app.service.common.data_sync_manager import DataSyncManager
-from app.service.common.utils import save_icon_file, create_access_token, admin_required
+from app.service.common.images import icon_renditions
+from app.service.common.metrics import metrics
+from app.service.common.utils import save_icon_file, create_access_token, admin_required, UploadTooLargeError
 from app.service.cur_unit_service import CurriculumUnitService
 from app.service.stud_group_service import StudGroupService
 from app.service.subject_service import SubjectService
+from app.service.sync_job_service import SyncJobService, SyncAlreadyRunning
 from app.service.tag_service import TagService
 from app.service.teacher_service import TeacherService
 
@@ -26,6 +30,7 @@ subjects_router = APIRouter(prefix="/subjects", tags=["Subjects"])
 stud_groups_router = APIRouter(prefix="/groups", tags=["Student groups"])
 sync_router = APIRouter(prefix="/sync", tags=["Synchronize"])
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
 
 
 @teachers_router.get(
@@ -115,7 +120,7 @@ def create_teacher(teacher: TeacherBase, service: TeacherService = Depends(get_t
         404: {"description": "Преподаватель не найден."},
     },
 )
-def upload_teacher_icon(
+async def upload_teacher_icon(
         teacher_id: int = Path(..., title="ID преподавателя"),
         icon: UploadFile = File(...),
         service: TeacherService = Depends(get_teacher_service),
@@ -125,15 +130,18 @@ def upload_teacher_icon(
     """
     if not icon.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Invalid file type. Expected an image.")
-    teacher = service.get_teacher_by_id(teacher_id)
+    teacher = await run_in_threadpool(service.get_teacher_by_id, teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail=f"Teacher with ID {teacher_id} not found")
     try:
-        icon_path = save_icon_file(icon, prefix=f"teacher_{teacher_id}")
+        icon_path = await save_icon_file(icon)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    service.update_teacher_icon(teacher_id, icon_path)
-    return {"message": "Icon uploaded successfully", "icon_path": icon_path}
+    await run_in_threadpool(service.update_teacher_icon, teacher_id, icon_path)
+    return {"message": "Icon uploaded successfully", "icon_path": icon_path,
+            "icon_renditions": icon_renditions(icon_path)}
 
 
 @sync_router.post(
@@ -151,8 +159,8 @@ def synchronize_teachers(service: TeacherService = Depends(get_teacher_service))
     try:
         url = settings.TEACHERS_URI
         teachers = service.fetch_teachers_from_api(url)
-        service.synchronize_teachers(teachers)
-        return {"message": "Teachers synchronized successfully"}
+        stats = service.synchronize_teachers(teachers)
+        return {"message": "Teachers synchronized successfully", "stats": stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -193,29 +201,133 @@ def create_tag(tag: TagBase, service: TagService = Depends(get_tag_service)):
     return created_tag
 
 
+def _check_month_filter(
+        year_min: int | None,
+        year_max: int | None,
+        month_min: int | None,
+        month_max: int | None,
+        month_mode: MonthFilterMode
+):
+    if (month_min or month_max) and not (year_min or year_max):
+        raise HTTPException(status_code=400,
+                            detail="Фильтрация по месяцу возможна только при указании диапазона годов.")
+    # Непрерывный период начинается с (year_min, month_min) и заканчивается (year_max, month_max):
+    # месяц без своего года задать границу не может
+    if month_mode == MonthFilterMode.continuous and (
+            (month_min and year_min is None) or (month_max and year_max is None)):
+        raise HTTPException(status_code=422,
+                            detail="В режиме continuous month_min задаётся вместе с year_min, "
+                                   "а month_max — вместе с year_max.")
+
+
 @articles_router.get(
     "/",
-    response_model=list[ArticleResponse],
+    response_model=list[ArticleResponse | ArticleSummaryResponse],
     responses={
         200: {"description": "Успешный ответ. Возвращает список статей."},
-        400: {"description": "Ошибка валидации. Например, если указан месяц без года."}
+        400: {"description": "Ошибка валидации. Например, если указан месяц без года."},
+        422: {"description": "В режиме continuous месяц указан без года той же границы периода."}
     },
 )
 def get_all_articles(
-        year_min: int | None = Query(None, description="Год с..."),
-        year_max: int | None = Query(None, description="Год по..."),
-        month_min: int | None = Query(None, description="Месяц с..."),
-        month_max: int | None = Query(None, description="Месяц по..."),
+        response: Response,
+        year_min: int | None = Query(None, ge=1, le=9998, description="Год с..."),
+        year_max: int | None = Query(None, ge=1, le=9998, description="Год по..."),
+        month_min: int | None = Query(None, ge=1, le=12, description="Месяц с..."),
+        month_max: int | None = Query(None, ge=1, le=12, description="Месяц по..."),
+        month_mode: MonthFilterMode = Query(
+            MonthFilterMode.each_year,
+            description="each_year — месяцы в каждом году диапазона, continuous — непрерывный период"
+        ),
         tags: list[str] | None = Query(None, description="Фильтр по тегам"),
-        page: int = Query(1, description="Номер страницы"),
-        limit: int = Query(12, description="Количество новостей на страницу"),
+        page: int = Query(1, ge=1, description="Номер страницы"),
+        limit: int = Query(12, ge=1, description="Количество новостей на страницу"),
+        cursor: str | None = Query(None, description="Курсор из заголовка X-Next-Cursor (вместо page)"),
+        view: ArticleView = Query(ArticleView.full, description="summary — без полного текста, с отрывком"),
         service: ArticleService = Depends(get_article_service),
 ):
-    if (month_min or month_max) and not (year_min or year_max):
-        raise HTTPException(status_code=400,
-                            detail="Фильтрация по месяцу возможна только при указании диапазона годов.")
-    articles = service.get_filtered_articles(year_min, year_max, month_min, month_max, tags, page, limit)
-    return articles
+    """
+    Возвращает страницу статей. Курсор на следующую страницу передаётся в заголовке X-Next-Cursor.
+    """
+    _check_month_filter(year_min, year_max, month_min, month_max, month_mode)
+    try:
+        articles_page = service.get_articles_page(year_min, year_max, month_min, month_max, tags, page, limit,
+                                                  month_mode, cursor, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if articles_page.next_cursor:
+        response.headers["X-Next-Cursor"] = articles_page.next_cursor
+    return articles_page.items
+
+
+@articles_router.get(
+    "/search",
+    response_model=list[ArticleResponse | ArticleSummaryResponse],
+    responses={
+        200: {"description": "Успешный ответ. Возвращает найденные статьи, самые релевантные первыми."},
+        400: {"description": "Ошибка валидации. Например, если указан месяц без года."},
+        422: {"description": "В режиме continuous месяц указан без года той же границы периода."}
+    },
+)
+def search_articles(
+        response: Response,
+        q: str = Query(..., min_length=1, description="Поисковый запрос"),
+        year_min: int | None = Query(None, ge=1, le=9998, description="Год с..."),
+        year_max: int | None = Query(None, ge=1, le=9998, description="Год по..."),
+        month_min: int | None = Query(None, ge=1, le=12, description="Месяц с..."),
+        month_max: int | None = Query(None, ge=1, le=12, description="Месяц по..."),
+        month_mode: MonthFilterMode = Query(
+            MonthFilterMode.each_year,
+            description="each_year — месяцы в каждом году диапазона, continuous — непрерывный период"
+        ),
+        tags: list[str] | None = Query(None, description="Фильтр по тегам"),
+        limit: int = Query(12, ge=1, description="Количество новостей на страницу"),
+        cursor: str | None = Query(None, description="Курсор из заголовка X-Next-Cursor"),
+        view: ArticleView = Query(ArticleView.full, description="summary — без полного текста, с отрывком"),
+        service: ArticleService = Depends(get_article_service),
+):
+    """
+    Полнотекстовый поиск по заголовкам и текстам статей. Курсор на следующую страницу передаётся
+    в заголовке X-Next-Cursor.
+    """
+    _check_month_filter(year_min, year_max, month_min, month_max, month_mode)
+    try:
+        articles_page = service.search_articles(q, year_min, year_max, month_min, month_max, tags, limit,
+                                                month_mode, cursor, view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if articles_page.next_cursor:
+        response.headers["X-Next-Cursor"] = articles_page.next_cursor
+    return articles_page.items
+
+
+@articles_router.get(
+    "/facets",
+    response_model=ArticleFacetsResponse,
+    responses={
+        200: {"description": "Успешный ответ. Возвращает количество статей по тегам, годам и месяцам."},
+        400: {"description": "Ошибка валидации. Например, если указан месяц без года."},
+        422: {"description": "В режиме continuous месяц указан без года той же границы периода."}
+    },
+)
+def get_article_facets(
+        year_min: int | None = Query(None, ge=1, le=9998, description="Год с..."),
+        year_max: int | None = Query(None, ge=1, le=9998, description="Год по..."),
+        month_min: int | None = Query(None, ge=1, le=12, description="Месяц с..."),
+        month_max: int | None = Query(None, ge=1, le=12, description="Месяц по..."),
+        month_mode: MonthFilterMode = Query(
+            MonthFilterMode.each_year,
+            description="each_year — месяцы в каждом году диапазона, continuous — непрерывный период"
+        ),
+        tags: list[str] | None = Query(None, description="Фильтр по тегам"),
+        service: ArticleService = Depends(get_article_service),
+):
+    """
+    Возвращает количество статей по тегам и по годам/месяцам для текущих фильтров.
+    Счётчики по тегам учитывают все фильтры, счётчики по датам — только фильтр по тегам.
+    """
+    _check_month_filter(year_min, year_max, month_min, month_max, month_mode)
+    return service.get_facets(year_min, year_max, month_min, month_max, tags, month_mode)
 
 
 @articles_router.get(
@@ -235,6 +347,23 @@ def get_latest_articles(service: ArticleService = Depends(get_article_service)):
     return articles
 
 
+@articles_router.get(
+    "/popular",
+    response_model=list[ArticlePopularResponse],
+    responses={
+        200: {"description": "Успешный ответ. Возвращает самые просматриваемые статьи."}
+    },
+)
+def get_popular_articles(
+        limit: int = Query(6, ge=1, le=50, description="Количество статей"),
+        service: ArticleService = Depends(get_article_service),
+):
+    """
+    Возвращает самые просматриваемые статьи. Просмотры учитываются с задержкой до сброса буфера.
+    """
+    return service.get_popular_articles(limit)
+
+
 @articles_router.get(
     "/{article_id}",
     response_model=ArticleResponse,
@@ -253,6 +382,7 @@ def get_article_by_id(
     article = service.get_article_by_id(article_id)
     if not article:
         raise HTTPException(status_code=404, detail="No articles found")
+    service.register_view(article_id)
     return article
 
 
@@ -265,7 +395,7 @@ def get_article_by_id(
         400: {"description": "Ошибка: статья с таким названием уже существует или файл имеет неправильный формат."},
     },
 )
-def create_article(
+async def create_article(
         icon: UploadFile | None = File(None),
         title: str = Form(...),
         content: str = Form(...),
@@ -280,13 +410,15 @@ def create_article(
         if not icon.content_type.startswith("image/"):
             raise HTTPException(status_code=400, detail="Invalid file type. Expected an image.")
         try:
-            icon_path = save_icon_file(icon, prefix=title)
+            icon_path = await save_icon_file(icon)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
     else:
         icon_path = settings.DEFAULT_ARTICLE_ICON  # например: "/static/icons/default_article.png"
     article_data = ArticleBase(title=title, content=content, tag_ids=tag_ids, icon=icon_path, event_date=event_date)
-    created_article = service.create_article(article_data)
+    created_article = await run_in_threadpool(service.create_article, article_data)
     if not created_article:
         raise HTTPException(status_code=400, detail="Article with this title already exists")
     return created_article
@@ -301,7 +433,7 @@ def create_article(
         404: {"description": "Статья не найдена."},
     },
 )
-def update_article(
+async def update_article(
         article_id: int,
         icon: UploadFile = File(None),
         title: str | None = Form(None),
@@ -313,9 +445,18 @@ def update_article(
     """
     Обновляет статью по ID. Все поля опциональны.
     """
-    updated = service.update_article_with_optional_fields(
+    icon_path = None
+    if icon and icon.filename:
+        try:
+            icon_path = await save_icon_file(icon)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    updated = await run_in_threadpool(
+        service.update_article_with_optional_fields,
         article_id=article_id,
-        icon=icon,
+        icon_path=icon_path,
         title=title,
         content=content,
         tag_ids=tag_ids,
@@ -379,8 +520,8 @@ def update_curriculum_units(service: CurriculumUnitService = Depends(get_curricu
     """
     try:
         url = settings.CUR_UNITS_URI
-        service.create_curriculum_units(url)
-        return {"message": "Curriculum_units added successfully"}
+        stats = service.create_curriculum_units(url)
+        return {"message": "Curriculum_units added successfully", "stats": stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -417,8 +558,8 @@ def update_subjects(service: SubjectService = Depends(get_subject_service)):
     """
     try:
         url = settings.SUBJECTS_URI
-        service.create_subjects(url)
-        return {"message": "Subjects added successfully"}
+        stats = service.create_subjects(url)
+        return {"message": "Subjects added successfully", "stats": stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -476,8 +617,8 @@ def update_stud_groups(service: StudGroupService = Depends(get_stud_group_servic
     """
     try:
         url = settings.STUB_GROUPS_URI
-        service.create_stud_groups(url)
-        return {"message": "Student groups added successfully"}
+        stats = service.create_stud_groups(url)
+        return {"message": "Student groups added successfully", "stats": stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -485,21 +626,45 @@ def update_stud_groups(service: StudGroupService = Depends(get_stud_group_servic
 @sync_router.post(
     "/all",
     dependencies=[Depends(admin_required)],
+    status_code=202,
+    response_model=SyncJobResponse,
     responses={
-        200: {"description": "Полная синхронизация завершена."},
-        500: {"description": "Ошибка во время полной синхронизации."}
+        202: {"description": "Синхронизация запущена или уже выполняется, возвращается её задача."},
+        409: {"description": "Синхронизация выполняется, но её задача ещё не создана."}
     }
 )
-def sync_all(service: DataSyncManager = Depends(get_data_sync_manager)):
+def sync_all(response: Response, service: SyncJobService = Depends(get_sync_job_service)):
     """
-    Полностью синхронизирует все данные с БРС: преподаватели, предметы, группы, учебные единицы (удаляя старые данные).
+    Запускает полную синхронизацию с БРС: преподаватели, предметы, группы, учебные единицы (удаляя старые данные).
+    Синхронизация идёт в фоне, одновременно во всём кластере выполняется только одна: повторный запрос
+    возвращает уже идущую задачу. Ход выполнения — в GET /sync/jobs/{job_id}.
     Данную ручку мы используем для кнопки в дальнейшем!!
     """
     try:
-        service.sync_all()
-        return {"message": "Information updated successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        job, _ = service.start_job()
+    except SyncAlreadyRunning as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    response.headers["Location"] = f"/sync/jobs/{job.id}"
+    return service.to_response_dto(job)
+
+
+@sync_router.get(
+    "/jobs/{job_id}",
+    dependencies=[Depends(admin_required)],
+    response_model=SyncJobResponse,
+    responses={
+        200: {"description": "Состояние задачи синхронизации."},
+        404: {"description": "Задача не найдена."}
+    }
+)
+def get_sync_job(job_id: int, service: SyncJobService = Depends(get_sync_job_service)):
+    """
+    Возвращает статус (running, succeeded, failed), текущую фазу, число строк по таблицам и длительность фаз.
+    """
+    job = service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return service.to_response_dto(job)
 
 
 @cur_units_router.get(
@@ -629,3 +794,15 @@ def login(
 
     token = create_access_token({"sub": user.username})
     return {"access_token": token, "token_type": "bearer"}
+
+
+@metrics_router.get(
+    "/",
+    dependencies=[Depends(admin_required)],
+    responses={200: {"description": "Счётчики и длительности операций текущего процесса."}},
+)
+def get_metrics():
+    """
+    Возвращает метрики текущего процесса (загрузки иконок и т.п.).
+    """
+    return metrics.snapshot()
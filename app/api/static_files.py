@@ -0,0 +1,136 @@
+import hashlib
+import os
+from mimetypes import guess_type
+import stat
+from functools import lru_cache
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Scope
+from app.config.config import settings
+from app.service.common.images import file_digest
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+# Кодирование -> расширение предварительно сжатой копии, в порядке предпочтения
+PRECOMPRESSED_ENCODINGS = {
+    "br": ".br",
+    "gzip": ".gz",
+}
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles с заголовками кэширования:
+    - файлы с хэшем содержимого в имени и иконки по умолчанию отдаются как неизменяемые на год;
+    - остальные файлы браузер перепроверяет по сильному ETag (хэш содержимого) и получает 304;
+    - если рядом лежит предварительно сжатая копия (`.br`, `.gz`) и клиент её принимает, отдаётся она.
+    Range-запросы обрабатывает FileResponse, If-Range сравнивается с тем же ETag.
+
+    Иконки по умолчанию считаются неизменяемыми, поэтому заменять их нужно файлом с новым именем.
+    """
+
+    def __init__(self, *args, immutable_files: set[str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_files = immutable_files or set()
+
+    def lookup_path(self, path: str) -> tuple[str, os.stat_result | None]:
+        # Выполняется в пуле потоков, поэтому хэш содержимого считаем здесь, а не в file_response
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            _content_etag(full_path, stat_result.st_mtime_ns, stat_result.st_size)
+            for ext in PRECOMPRESSED_ENCODINGS.values():
+                try:
+                    variant_stat = os.stat(full_path + ext)
+                except FileNotFoundError:
+                    continue
+                _content_etag(full_path + ext, variant_stat.st_mtime_ns, variant_stat.st_size)
+        return full_path, stat_result
+
+    def file_response(
+            self,
+            full_path: str,
+            stat_result: os.stat_result,
+            scope: Scope,
+            status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        immutable = file_digest(name) is not None or name in self.immutable_files
+        headers = {
+            "cache-control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+            "etag": _content_etag(full_path, stat_result.st_mtime_ns, stat_result.st_size),
+        }
+        media_type = None
+
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        variants = [(encoding, full_path + ext) for encoding, ext in PRECOMPRESSED_ENCODINGS.items()
+                    if os.path.isfile(full_path + ext)]
+        if variants:
+            headers["vary"] = "Accept-Encoding"
+        for encoding, variant_path in variants:
+            if encoding in accepted:
+                media_type = guess_type(full_path)[0] or "text/plain"
+                stat_result = os.stat(variant_path)
+                full_path = variant_path
+                headers["content-encoding"] = encoding
+                headers["etag"] = _content_etag(full_path, stat_result.st_mtime_ns, stat_result.st_size)
+                break
+
+        response = _StaticFileResponse(
+            full_path, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_result
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        # При наличии If-None-Match заголовок If-Modified-Since не учитывается (RFC 9110, 13.1.3)
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is None:
+            return super().is_not_modified(response_headers, request_headers)
+        etag = response_headers["etag"]
+        return any(tag.strip().removeprefix("W/") in (etag, "*") for tag in if_none_match.split(","))
+
+
+class _StaticFileResponse(FileResponse):
+    def _should_use_range(self, http_if_range: str, stat_result: os.stat_result) -> bool:
+        # If-Range допускает только сильный ETag или точную дату изменения
+        return http_if_range in (self.headers["etag"], self.headers["last-modified"])
+
+
+def create_static_files(directory: str) -> CachedStaticFiles:
+    default_icons = (settings.DEFAULT_ARTICLE_ICON, settings.DEFAULT_MAN_ICON, settings.DEFAULT_WOMAN_ICON)
+    return CachedStaticFiles(
+        directory=directory,
+        immutable_files={os.path.basename(icon) for icon in default_icons if icon},
+    )
+
+
+@lru_cache(maxsize=4096)
+def _content_etag(full_path: str, mtime_ns: int, size: int) -> str:
+    # mtime_ns и size входят в ключ кэша, чтобы изменённый файл получил новый ETag
+    name = os.path.basename(full_path)
+    if file_digest(name) is not None:
+        return f'"{name}"'
+    content_hash = hashlib.sha256()
+    with open(full_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            content_hash.update(chunk)
+    return f'"{content_hash.hexdigest()[:32]}"'
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        encoding, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(encoding.strip().lower())
+    return accepted
@@ -17,10 +17,40 @@ class Settings(BaseSettings):
     CUR_UNITS_URI: str = os.getenv("CUR_UNITS_URI")
     SUBJECTS_URI: str = os.getenv("SUBJECTS_URI")
     STUB_GROUPS_URI: str = os.getenv("STUB_GROUPS_URI")
+    BRS_TIMEOUT_SECONDS: float = os.getenv("BRS_TIMEOUT_SECONDS", 15)
+    BRS_CONNECT_TIMEOUT_SECONDS: float = os.getenv("BRS_CONNECT_TIMEOUT_SECONDS", 5)
+    BRS_MAX_RETRIES: int = os.getenv("BRS_MAX_RETRIES", 3)
+    BRS_RETRY_BASE_DELAY_SECONDS: float = os.getenv("BRS_RETRY_BASE_DELAY_SECONDS", 0.5)
+    BRS_RETRY_MAX_DELAY_SECONDS: float = os.getenv("BRS_RETRY_MAX_DELAY_SECONDS", 8)
+    BRS_MAX_CONNECTIONS: int = os.getenv("BRS_MAX_CONNECTIONS", 8)
+    BRS_SYNC_DEADLINE_SECONDS: float = os.getenv("BRS_SYNC_DEADLINE_SECONDS", 600)
+    # Где выполняется синхронизация: "process" — отдельный процесс-воркер, "thread" — поток веб-процесса
+    SYNC_EXECUTION_MODE: str = os.getenv("SYNC_EXECUTION_MODE", "process")
+    # Расписание полной синхронизации с БРС в формате crontab (по умолчанию — воскресенье, 00:00)
+    SYNC_SCHEDULE_CRON: str = os.getenv("SYNC_SCHEDULE_CRON", "0 0 * * sun")
+    SYNC_MISFIRE_GRACE_SECONDS: int = os.getenv("SYNC_MISFIRE_GRACE_SECONDS", 3600)
+    SCHEDULER_LEADER_HEARTBEAT_SECONDS: int = os.getenv("SCHEDULER_LEADER_HEARTBEAT_SECONDS", 15)
+    SYNC_CHUNK_SIZE: int = os.getenv("SYNC_CHUNK_SIZE", 500)
+    # Потоковая синхронизация учебных единиц: ответы БРС разбираются по частям, запись идёт пачками
+    SYNC_STREAM_CURRICULUM_UNITS: bool = os.getenv("SYNC_STREAM_CURRICULUM_UNITS", False)
+    SYNC_STREAM_CHUNK_SIZE: int = os.getenv("SYNC_STREAM_CHUNK_SIZE", 5000)
+    BRS_PROBE_FLOOR_YEAR: int = os.getenv("BRS_PROBE_FLOOR_YEAR", 2020)
+    BRS_PROBE_BUDGET: int = os.getenv("BRS_PROBE_BUDGET", 12)
+    BRS_PROBE_BATCH_SIZE: int = os.getenv("BRS_PROBE_BATCH_SIZE", 4)
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     DEFAULT_ARTICLE_ICON: str = os.getenv("DEFAULT_ARTICLE_ICON")
     DEFAULT_MAN_ICON: str = os.getenv("DEFAULT_MAN_ICON")
     DEFAULT_WOMAN_ICON: str = os.getenv("DEFAULT_WOMAN_ICON")
+    MAX_UPLOAD_SIZE_BYTES: int = os.getenv("MAX_UPLOAD_SIZE_BYTES", 10 * 1024 * 1024)
+    IMAGE_WORKERS: int = os.getenv("IMAGE_WORKERS", 2)
+    ICON_GC_INTERVAL_SECONDS: int = os.getenv("ICON_GC_INTERVAL_SECONDS", 3600)
+    ICON_GC_BATCH_SIZE: int = os.getenv("ICON_GC_BATCH_SIZE", 500)
+    ICON_GC_GRACE_SECONDS: int = os.getenv("ICON_GC_GRACE_SECONDS", 3600)
+    TAG_INDEX_TTL_SECONDS: int = os.getenv("TAG_INDEX_TTL_SECONDS", 60)
+    LATEST_ARTICLES_CACHE_TTL_SECONDS: int = os.getenv("LATEST_ARTICLES_CACHE_TTL_SECONDS", 300)
+    ARTICLE_FACETS_CACHE_TTL_SECONDS: int = os.getenv("ARTICLE_FACETS_CACHE_TTL_SECONDS", 300)
+    POPULAR_ARTICLES_CACHE_TTL_SECONDS: int = os.getenv("POPULAR_ARTICLES_CACHE_TTL_SECONDS", 300)
+    VIEWS_FLUSH_INTERVAL_SECONDS: int = os.getenv("VIEWS_FLUSH_INTERVAL_SECONDS", 30)
 
     @property
     def database_url(self) -> str:
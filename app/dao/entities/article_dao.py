@@ -1,7 +1,12 @@
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, case, extract, distinct
-from app.dao.models import Article, Tag, ArticleTagAssociation
+from datetime import datetime, timedelta, date
+from sqlalchemy.orm import Session, joinedload, selectinload, defer, with_expression
+from sqlalchemy import func, extract, and_, or_, false, true, tuple_, cast, REAL, values, column, \
+    update, Integer, select, union_all, distinct
+from app.dao.enums import MonthFilterMode
+from app.dao.models import Article, Tag, ArticleTagAssociation, ARTICLE_SEARCH_CONFIG
+
+MAX_ENUMERATED_YEARS = 50
+EXCERPT_LENGTH = 200
 
 
 class ArticleDAO:
@@ -9,16 +14,35 @@ class ArticleDAO:
         self.db = db
 
     def get_all_articles(self):
-        return self.db.query(Article).all()
+        return self.db.query(Article).options(_load_tag_ids()).all()
 
     def get_tags_by_ids(self, tag_ids: list[int]):
         return self.db.query(Tag).filter(Tag.id.in_(tag_ids)).all()
 
+    def get_articles_by_ids(self, article_ids: list[int], summary: bool = False):
+        query = (self.db.query(Article)
+                 .filter(Article.id.in_(article_ids))
+                 .options(_load_tag_ids()))
+        return _apply_view(query, summary).all()
+
+    def get_article_event_dates(self):
+        return self.db.query(Article.id, Article.event_date).all()
+
+    def get_article_tag_links(self):
+        return self.db.query(ArticleTagAssociation.article_id, ArticleTagAssociation.tag_id).all()
+
+    def get_tag_names(self):
+        return self.db.query(Tag.id, Tag.name).all()
+
     def get_article_by_title(self, title: str):
         return self.db.query(Article).filter(Article.title == title).first()
 
     def get_article_by_id(self, article_id: int):
-        return self.db.query(Article).filter(Article.id == article_id).first()
+        # Одна статья: теги подтягиваем тем же запросом
+        return (self.db.query(Article)
+                .filter(Article.id == article_id)
+                .options(joinedload(Article.tags).load_only(Tag.id))
+                .first())
 
     def create_article(self, article: Article):
         self.db.add(article)
@@ -27,19 +51,28 @@ class ArticleDAO:
         return article
 
     def get_latest_articles(self, limit: int = 6):
-        today = (datetime.utcnow() + timedelta(hours=3)).date()
-        days_diff = func.abs(func.date(Article.event_date) - today)
-        case_order = case(
-            {
-                True: 0,
-                False: 1
-            },
-            value=(Article.event_date >= today)
-        )
-        return (self.db.query(Article)
-                .order_by(days_diff, case_order, Article.event_date)
+        """
+        Возвращает статьи, ближайшие к сегодняшнему дню. Вместо сортировки всей таблицы по расстоянию
+        делаются два ограниченных прохода по индексу: ближайшие будущие (включая сегодня) и ближайшие прошедшие.
+        Порядок: по удалённости от сегодня, при равной удалённости будущие раньше прошедших.
+        """
+        today = moscow_today()
+        upcoming = (select(Article.id)
+                    .where(Article.event_date >= today)
+                    .order_by(Article.event_date.asc(), Article.id.asc())
+                    .limit(limit)
+                    .subquery())
+        past = (select(Article.id)
+                .where(Article.event_date < today)
+                .order_by(Article.event_date.desc(), Article.id.desc())
                 .limit(limit)
-                .all())
+                .subquery())
+        candidate_ids = union_all(select(upcoming.c.id), select(past.c.id))
+        articles = (self.db.query(Article)
+                    .filter(Article.id.in_(candidate_ids))
+                    .options(defer(Article.content), _load_tag_ids())
+                    .all())
+        return sorted(articles, key=lambda article: latest_order_key(article.event_date, article.id, today))[:limit]
 
     def get_filtered_articles(
             self,
@@ -47,34 +80,162 @@ class ArticleDAO:
             year_max: int | None,
             month_min: int | None,
             month_max: int | None,
-            tags: list[str] | None,
-            page: int,
-            limit: int
+            offset: int,
+            limit: int,
+            month_mode: MonthFilterMode = MonthFilterMode.each_year,
+            after: tuple[date, int] | None = None,
+            summary: bool = False
     ):
+        """
+        `after` — ключ (event_date, id) последней статьи предыдущей страницы.
+        Если он передан, страница выбирается по ключу, а `offset` игнорируется.
+        """
         query = self.db.query(Article)
-        if tags:
-            tag_count = len(tags)
-            query = (
-                query.join(ArticleTagAssociation)
-                .join(Tag)
-                .filter(Tag.name.in_(tags))
-                .group_by(Article.id)
-                .having(func.count(distinct(Tag.name)) == tag_count)
-            )
-        if year_min is not None:
-            query = query.filter(extract("year", Article.event_date) >= year_min)
-        if year_max is not None:
-            query = query.filter(extract("year", Article.event_date) <= year_max)
-        if month_min is not None:
-            query = query.filter(extract("month", Article.event_date) >= month_min)
-        if month_max is not None:
-            query = query.filter(extract("month", Article.event_date) <= month_max)
-        query = query.options(joinedload(Article.tags))
-        query = query.order_by(Article.event_date.desc()) \
-            .offset((page - 1) * limit) \
-            .limit(limit)
-
-        return query.all()
+        date_filter = self._event_date_filter(year_min, year_max, month_min, month_max, month_mode)
+        if date_filter is not None:
+            query = query.filter(date_filter)
+        if after is not None:
+            query = query.filter(tuple_(Article.event_date, Article.id) < tuple_(*after))
+        query = _apply_view(query.options(_load_tag_ids()), summary)
+        query = query.order_by(Article.event_date.desc(), Article.id.desc())
+        if after is None:
+            query = query.offset(offset)
+
+        return query.limit(limit).all()
+
+    def search_articles(
+            self,
+            text: str,
+            year_min: int | None,
+            year_max: int | None,
+            month_min: int | None,
+            month_max: int | None,
+            limit: int,
+            month_mode: MonthFilterMode = MonthFilterMode.each_year,
+            article_ids: frozenset[int] | None = None,
+            after: tuple[float, int] | None = None,
+            summary: bool = False
+    ) -> list[tuple[Article, float]]:
+        """
+        Полнотекстовый поиск по заголовку и тексту (GIN-индекс по search_vector).
+        Результаты упорядочены по релевантности; `after` — ключ (rank, id) последней статьи предыдущей страницы.
+        `article_ids` ограничивает поиск заранее отобранными статьями (например, по тегам).
+        """
+        ts_query = func.websearch_to_tsquery(ARTICLE_SEARCH_CONFIG, text)
+        rank = func.ts_rank_cd(Article.search_vector, ts_query)
+        query = self.db.query(Article, rank).filter(Article.search_vector.op("@@")(ts_query))
+        date_filter = self._event_date_filter(year_min, year_max, month_min, month_max, month_mode)
+        if date_filter is not None:
+            query = query.filter(date_filter)
+        if article_ids is not None:
+            query = query.filter(Article.id.in_(article_ids))
+        if after is not None:
+            # ts_rank_cd возвращает real: сравниваем в том же типе, иначе строки с равным рангом потеряются
+            after_rank, after_id = after
+            query = query.filter(tuple_(rank, Article.id) < tuple_(cast(after_rank, REAL), after_id))
+        return (_apply_view(query.options(_load_tag_ids()), summary)
+                .order_by(rank.desc(), Article.id.desc())
+                .limit(limit)
+                .all())
+
+    def get_facet_counts(
+            self,
+            year_min: int | None,
+            year_max: int | None,
+            month_min: int | None,
+            month_max: int | None,
+            month_mode: MonthFilterMode = MonthFilterMode.each_year,
+            article_ids: frozenset[int] | None = None
+    ):
+        """
+        Считает одним запросом (GROUPING SETS) количество статей по тегам, годам и месяцам.
+        Счётчики по тегам учитывают фильтр по датам, счётчики по датам — нет (как в фасетном поиске).
+        `article_ids` — статьи, прошедшие фильтр по тегам; он применяется ко всем счётчикам.
+        Возвращает строки (kind, tag_id, tag_name, year, month, count), где kind — "tag", "year" или "month".
+        """
+        year = cast(extract("year", Article.event_date), Integer).label("year")
+        month = cast(extract("month", Article.event_date), Integer).label("month")
+        tag_count = func.count(distinct(Article.id))
+        date_filter = self._event_date_filter(year_min, year_max, month_min, month_max, month_mode)
+        if date_filter is not None:
+            tag_count = tag_count.filter(date_filter)
+        query = (self.db.query(
+                    func.grouping(Tag.id, Tag.name).label("tag_grouping"),
+                    Tag.id, Tag.name, year, month,
+                    tag_count.label("tag_count"),
+                    func.count(distinct(Article.id)).label("date_count"),
+                 )
+                 .select_from(Article)
+                 .outerjoin(ArticleTagAssociation, ArticleTagAssociation.article_id == Article.id)
+                 .outerjoin(Tag, Tag.id == ArticleTagAssociation.tag_id))
+        if article_ids is not None:
+            query = query.filter(Article.id.in_(article_ids))
+        query = query.group_by(func.grouping_sets(
+            tuple_(Tag.id, Tag.name),
+            tuple_(year),
+            tuple_(year, month),
+        ))
+        rows = []
+        for tag_grouping, tag_id, tag_name, row_year, row_month, tag_cnt, date_cnt in query.all():
+            if tag_grouping == 0:
+                if tag_id is not None and tag_cnt:
+                    rows.append(("tag", tag_id, tag_name, None, None, tag_cnt))
+            elif row_month is None:
+                rows.append(("year", None, None, row_year, None, date_cnt))
+            else:
+                rows.append(("month", None, None, row_year, row_month, date_cnt))
+        return rows
+
+    @staticmethod
+    def _event_date_filter(
+            year_min: int | None,
+            year_max: int | None,
+            month_min: int | None,
+            month_max: int | None,
+            month_mode: MonthFilterMode
+    ):
+        """
+        Строит фильтр по event_date в виде диапазонов дат (а не extract()),
+        чтобы Postgres мог использовать индекс ix_articles_event_date_id.
+        """
+        ranges, months = event_date_ranges(year_min, year_max, month_min, month_max, month_mode)
+        if ranges == [(None, None)] and months is None:
+            return None
+        if not ranges:
+            return false()
+        conditions = [
+            or_(*[_range_condition(start, end) for start, end in ranges]) if len(ranges) > 1
+            else _range_condition(*ranges[0])
+        ]
+        if months is not None:
+            if months[0] is not None:
+                conditions.append(extract("month", Article.event_date) >= months[0])
+            if months[1] is not None:
+                conditions.append(extract("month", Article.event_date) <= months[1])
+        return and_(*conditions)
+
+    def get_popular_articles(self, limit: int):
+        return (self.db.query(Article)
+                .options(defer(Article.content), _load_tag_ids())
+                .order_by(Article.views.desc().nulls_last(), Article.id.desc())
+                .limit(limit)
+                .all())
+
+    def increment_views(self, counts: dict[int, int]):
+        """
+        Прибавляет просмотры сразу ко всем статьям одним UPDATE ... FROM (VALUES ...).
+        Строки сортируются по id, чтобы параллельные сбросы из разных воркеров не взаимоблокировались.
+        """
+        increments = values(
+            column("article_id", Integer), column("views", Integer), name="increments"
+        ).data(sorted(counts.items()))
+        self.db.execute(
+            update(Article)
+            .where(Article.id == increments.c.article_id)
+            .values(views=func.coalesce(Article.views, 0) + increments.c.views)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
 
     def update_article(self, article: Article):
         self.db.add(article)
@@ -85,3 +246,112 @@ class ArticleDAO:
     def delete_article(self, article: Article):
         self.db.delete(article)
         self.db.commit()
+
+
+def _load_tag_ids():
+    """
+    Единая стратегия загрузки тегов для списков статей: один дополнительный запрос
+    на всю выборку (а не по запросу на статью), и только id тегов.
+    """
+    return selectinload(Article.tags).load_only(Tag.id)
+
+
+def _apply_view(query, summary: bool):
+    """
+    В режиме summary не загружает content, а берёт из БД только его начало для отрывка (Article.excerpt).
+    """
+    if not summary:
+        return query
+    return query.options(
+        defer(Article.content),
+        with_expression(Article.excerpt, func.substr(Article.content, 1, EXCERPT_LENGTH + 1)),
+    )
+
+
+def moscow_today() -> date:
+    """
+    Текущая дата по Москве (UTC+3), относительно которой выбираются последние статьи.
+    """
+    return (datetime.utcnow() + timedelta(hours=3)).date()
+
+
+def latest_order_key(event_date: date, article_id: int, today: date) -> tuple[int, bool, int]:
+    """
+    Ключ порядка последних статей: удалённость от сегодня, при равной удалённости будущие раньше прошедших,
+    затем порядок соответствующего прохода по индексу (event_date, id).
+    """
+    upcoming = event_date >= today
+    return abs((event_date - today).days), not upcoming, article_id if upcoming else -article_id
+
+
+def event_date_ranges(
+        year_min: int | None,
+        year_max: int | None,
+        month_min: int | None,
+        month_max: int | None,
+        month_mode: MonthFilterMode
+) -> tuple[list[tuple[date | None, date | None]], tuple[int | None, int | None] | None]:
+    """
+    Переводит фильтр по годам/месяцам в список полуинтервалов [start, end) по event_date
+    (подходит дата, попавшая хотя бы в один из них) и, если месяцы не удалось развернуть
+    в интервалы, — пару (month_min, month_max) для дополнительной проверки.
+    """
+    if month_mode == MonthFilterMode.continuous:
+        start = date(year_min, month_min or 1, 1) if year_min is not None else None
+        end = _month_start_after(year_max, month_max or 12) if year_max is not None else None
+        return [(start, end)], None
+
+    start = date(year_min, 1, 1) if year_min is not None else None
+    end = date(year_max + 1, 1, 1) if year_max is not None else None
+    if month_min is None and month_max is None:
+        return [(start, end)], None
+
+    if year_min is None or year_max is None or year_max - year_min >= MAX_ENUMERATED_YEARS:
+        # Годы не перечислить (диапазон открыт или слишком широк),
+        # поэтому месяцы проверяем поверх диапазона по индексу.
+        return [(start, end)], (month_min, month_max)
+
+    first_month, last_month = month_min or 1, month_max or 12
+    if first_month > last_month or year_min > year_max:
+        return [], None
+    return [
+        (date(year, first_month, 1), _month_start_after(year, last_month))
+        for year in range(year_min, year_max + 1)
+    ], None
+
+
+def event_date_matches(
+        event_date: date,
+        ranges: list[tuple[date | None, date | None]],
+        months: tuple[int | None, int | None] | None
+) -> bool:
+    """
+    Проверяет дату на соответствие результату event_date_ranges без обращения к БД.
+    """
+    if months is not None:
+        if months[0] is not None and event_date.month < months[0]:
+            return False
+        if months[1] is not None and event_date.month > months[1]:
+            return False
+    return any(
+        (start is None or event_date >= start) and (end is None or event_date < end)
+        for start, end in ranges
+    )
+
+
+def _range_condition(start: date | None, end: date | None):
+    conditions = []
+    if start is not None:
+        conditions.append(Article.event_date >= start)
+    if end is not None:
+        conditions.append(Article.event_date < end)
+    return and_(*conditions) if conditions else true()
+
+
+def _month_start_after(year: int, month: int) -> date:
+    """
+    Возвращает первое число месяца, следующего за (year, month).
+    """
+    if month == 12:
+        return date(year + 1, 1, 1)
+    return date(year, month + 1, 1)
@@ -0,0 +1,28 @@
+from sqlalchemy.orm import Session
+from app.dao.db_config import Base
+
+
+class BrsEntityDAO:
+    """
+    Общая часть DAO справочников, которые сервисы синхронизируют с БРС пачками:
+    загрузка существующих строк пачки одним запросом и запись пачки.
+    Наследник задаёт модель и имя колонки, по которой запись БРС сопоставляется со строкой.
+    """
+    model: type[Base]
+    key_column: str = "brs_id"
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_keys(self, keys: list) -> dict:
+        """
+        Возвращает строки, у которых значение key_column входит в `keys`, в виде словаря {значение: строка}.
+        """
+        column = getattr(self.model, self.key_column)
+        return {getattr(row, self.key_column): row for row in self.db.query(self.model).filter(column.in_(keys))}
+
+    def save_changes(self, commit: bool = True):
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
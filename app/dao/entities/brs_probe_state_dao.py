@@ -0,0 +1,35 @@
+from datetime import datetime
+import pytz
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.dao.models import BrsProbeState
+
+
+class BrsProbeStateDAO:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_last_found(self) -> dict[str, tuple[int, int]]:
+        return {
+            state.source: (state.year, state.session_num)
+            for state in self.db.query(BrsProbeState).all()
+        }
+
+    def save_last_found(self, source: str, year: int, session_num: int):
+        """
+        Сохраняет пару (год, сессия) для источника без commit — запись идёт в транзакции синхронизации.
+        """
+        statement = insert(BrsProbeState).values(
+            source=source,
+            year=year,
+            session_num=session_num,
+            updated_at=datetime.now(pytz.timezone('Europe/Moscow')),
+        )
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[BrsProbeState.source],
+            set_={
+                "year": statement.excluded.year,
+                "session_num": statement.excluded.session_num,
+                "updated_at": statement.excluded.updated_at,
+            },
+        ))
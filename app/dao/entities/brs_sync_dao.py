@@ -0,0 +1,173 @@
+import io
+from typing import Iterable
+from sqlalchemy import Table, Column, MetaData, select, delete, exists, func, case, literal_column, Boolean, \
+    union, true, false, tuple_, BigInteger, Identity
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.dao.models import Teacher, CurriculumUnit, TeacherCurriculumUnitLink
+
+# Порядковый номер строки во временной таблице, по которому из повторов одного brs_id выбирается последний
+STAGING_SEQUENCE_COLUMN = "sync_seq"
+
+
+class BrsSyncDAO:
+    """
+    Set-based запись справочников БРС: входящие строки копируются через COPY во временную таблицу,
+    затем одним INSERT ... ON CONFLICT вставляются и обновляются, а одним DELETE удаляются отсутствующие.
+    Все операции выполняются в текущей транзакции сессии, временные таблицы удаляются при её завершении.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._staged: dict[str, Table] = {}
+
+    def stage(self, model, rows: list[dict], columns: list[str]):
+        """
+        Создаёт временную таблицу с колонками `columns` таблицы `model` и загружает в неё `rows` через COPY.
+        """
+        self.create_staging(model, columns)
+        self.copy_to_staging(model, rows)
+
+    def create_staging(self, model, columns: list[str], keep_last: bool = False):
+        """
+        Создаёт пустую временную таблицу с колонками `columns` таблицы `model`.
+        С `keep_last=True` brs_id в ней могут повторяться: строки нумеруются в порядке загрузки,
+        и upsert_staged берёт для каждого brs_id последнюю.
+        """
+        table = model.__table__
+        sequence = [Column(STAGING_SEQUENCE_COLUMN, BigInteger, Identity())] if keep_last else []
+        staging = Table(
+            f"sync_{table.name}",
+            MetaData(),
+            *[Column(name, table.c[name].type) for name in columns],
+            *sequence,
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DROP",
+        )
+        staging.create(self.db.connection())
+        self._staged[table.name] = staging
+
+    def copy_to_staging(self, model, rows: Iterable[dict]):
+        """
+        Дописывает `rows` во временную таблицу `model` через COPY. Для загрузки пачками вызывается многократно.
+        """
+        staging = self._staged[model.__table__.name]
+        columns = _data_columns(staging)
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(_copy_value(row.get(name)) for name in columns))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {staging.name} ({', '.join(columns)}) FROM STDIN", buffer)
+        finally:
+            cursor.close()
+
+    def upsert_staged(self, model, default_icons: dict[str, str] | None = None) -> tuple[int, int]:
+        """
+        Вставляет новые и обновляет изменившиеся (по brs_fingerprint) строки из временной таблицы.
+        Синхронизация отдельных справочников (/sync/*) сохраняет такой же отпечаток (brs_records.to_sync_row),
+        поэтому записанные ею строки, не изменившиеся в БРС, здесь не перезаписываются.
+        Иконка существующего преподавателя не обновляется, новому без иконки назначается иконка
+        по умолчанию из `default_icons` по полу. Возвращает (вставлено, обновлено).
+        """
+        table = model.__table__
+        staging = self._staged[table.name]
+        columns = _data_columns(staging)
+        values = [staging.c[name] for name in columns]
+        if model is Teacher and default_icons:
+            icon_index = columns.index("icon")
+            values[icon_index] = func.coalesce(
+                staging.c.icon,
+                case(default_icons, value=staging.c.gender, else_=None),
+            ).label("icon")
+
+        source = select(*values)
+        if STAGING_SEQUENCE_COLUMN in staging.c:
+            source = source.distinct(staging.c.brs_id).order_by(
+                staging.c.brs_id, staging.c[STAGING_SEQUENCE_COLUMN].desc()
+            )
+        statement = insert(table).from_select(columns, source)
+        preserved = {"brs_id", "icon"} if model is Teacher else {"brs_id"}
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.brs_id],
+            set_={name: statement.excluded[name] for name in columns if name not in preserved},
+            where=table.c.brs_fingerprint.is_distinct_from(statement.excluded.brs_fingerprint),
+        )
+        # xmax = 0 только у строк, вставленных этим запросом, у обновлённых он равен id текущей транзакции
+        upserted = statement.returning(literal_column("xmax = 0", Boolean).label("inserted")).cte("upserted")
+        inserted, updated = self.db.execute(select(
+            func.count().filter(upserted.c.inserted),
+            func.count().filter(~upserted.c.inserted),
+        )).one()
+        return inserted, updated
+
+    def delete_missing(self, model) -> int:
+        """
+        Удаляет строки, которых нет во временной таблице (anti-join по brs_id). Возвращает число удалённых.
+        """
+        table = model.__table__
+        staging = self._staged[table.name]
+        result = self.db.execute(
+            delete(table).where(~exists().where(staging.c.brs_id == table.c.brs_id))
+        )
+        return result.rowcount
+
+    def rebuild_teacher_links(self) -> tuple[int, int]:
+        """
+        Приводит teacher_curriculum_unit_link к связям, которые следуют из curriculum_units:
+        основной преподаватель (teacher_brs_id) и преподаватели практики (unnest(practice_teacher_brs_ids)).
+        Недостающие связи вставляются одним INSERT ... SELECT, устаревшие удаляются одним DELETE.
+        Возвращает (вставлено, удалено).
+        """
+        link = TeacherCurriculumUnitLink.__table__
+        practice_teacher = (
+            func.unnest(CurriculumUnit.practice_teacher_brs_ids)
+            .table_valued("brs_id")
+            .render_derived(name="practice_teacher")
+            .lateral()
+        )
+        expected = union(
+            select(
+                Teacher.id.label("teacher_id"),
+                CurriculumUnit.id.label("curriculum_unit_id"),
+                false().label("is_practice"),
+            )
+            .join(Teacher, Teacher.brs_id == CurriculumUnit.teacher_brs_id),
+            select(Teacher.id, CurriculumUnit.id, true())
+            .select_from(CurriculumUnit)
+            .join(practice_teacher, true())
+            .join(Teacher, Teacher.brs_id == practice_teacher.c.brs_id),
+        ).cte("expected_links")
+        expected_key = tuple_(*expected.c)
+        link_key = tuple_(link.c.teacher_id, link.c.curriculum_unit_id, link.c.is_practice)
+
+        deleted = self.db.execute(
+            delete(link).where(~exists().where(expected_key == link_key))
+        ).rowcount
+        inserted = self.db.execute(
+            insert(link)
+            .from_select(["teacher_id", "curriculum_unit_id", "is_practice"], select(expected))
+            .on_conflict_do_nothing(constraint="uq_teacher_curriculum_unit_link")
+        ).rowcount
+        return inserted, deleted
+
+
+def _data_columns(staging: Table) -> list[str]:
+    return [column.name for column in staging.columns if column.name != STAGING_SEQUENCE_COLUMN]
+
+
+def _copy_value(value) -> str:
+    """
+    Значение в текстовом формате COPY.
+    """
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, tuple)):
+        text = "{" + ",".join("NULL" if item is None else str(item) for item in value) + "}"
+    else:
+        text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
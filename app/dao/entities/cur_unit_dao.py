@@ -1,11 +1,10 @@
 from typing import Type
-from sqlalchemy.orm import Session
+from app.dao.entities.brs_entity_dao import BrsEntityDAO
 from app.dao.models import CurriculumUnit, Teacher, Subject, StudGroup
 
 
-class CurriculumUnitDAO:
-    def __init__(self, db: Session):
-        self.db = db
+class CurriculumUnitDAO(BrsEntityDAO):
+    model = CurriculumUnit
 
     def get_all_curriculum_units(self) -> list[Type[CurriculumUnit]]:
         return self.db.query(CurriculumUnit).all()
@@ -0,0 +1,18 @@
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+from app.dao.models import Teacher, Article
+
+
+class IconDAO:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_referenced_icons(self) -> set[str]:
+        """
+        Возвращает все пути иконок, на которые ссылаются преподаватели и статьи.
+        """
+        query = union(
+            select(Teacher.icon).where(Teacher.icon.isnot(None)),
+            select(Article.icon).where(Article.icon.isnot(None)),
+        )
+        return set(self.db.execute(query).scalars())
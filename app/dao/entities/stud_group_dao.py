@@ -1,10 +1,9 @@
-from sqlalchemy.orm import Session
+from app.dao.entities.brs_entity_dao import BrsEntityDAO
 from app.dao.models import StudGroup
 
 
-class StudGroupDAO:
-    def __init__(self, db: Session):
-        self.db = db
+class StudGroupDAO(BrsEntityDAO):
+    model = StudGroup
 
     def get_all_stud_groups(self):
         return self.db.query(StudGroup).all()
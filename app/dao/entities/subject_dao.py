@@ -1,11 +1,11 @@
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm import aliased
 from app.api.dto import SubjectWithPracticeResponse
+from app.dao.entities.brs_entity_dao import BrsEntityDAO
 from app.dao.models import Subject, TeacherCurriculumUnitLink, CurriculumUnit
 
 
-class SubjectDAO:
-    def __init__(self, db: Session):
-        self.db = db
+class SubjectDAO(BrsEntityDAO):
+    model = Subject
 
     def get_all_subjects(self):
         return self.db.query(Subject).all()
@@ -0,0 +1,46 @@
+from datetime import datetime
+import pytz
+from sqlalchemy.orm import Session
+from app.dao.models import SyncJob
+
+
+class SyncJobDAO:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_job_by_id(self, job_id: int) -> SyncJob | None:
+        return self.db.query(SyncJob).filter(SyncJob.id == job_id).first()
+
+    def get_running_job(self) -> SyncJob | None:
+        return (
+            self.db.query(SyncJob)
+            .filter(SyncJob.status == "running")
+            .order_by(SyncJob.id.desc())
+            .first()
+        )
+
+    def create_job(self) -> SyncJob:
+        job = SyncJob(status="running", timings={})
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def update_job(self, job: SyncJob, **fields):
+        for key, value in fields.items():
+            setattr(job, key, value)
+        self.db.commit()
+
+    def fail_interrupted_jobs(self):
+        """
+        Помечает как упавшие задачи в статусе running, чей процесс завершился, не сняв блокировку.
+        """
+        self.db.query(SyncJob).filter(SyncJob.status == "running").update(
+            {
+                "status": "failed",
+                "error": "Interrupted",
+                "finished_at": datetime.now(pytz.timezone('Europe/Moscow')),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
@@ -1,12 +1,13 @@
 from sqlalchemy import case, asc
-from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm import aliased
 from app.api.dto import TeacherWithPracticeResponse
+from app.dao.entities.brs_entity_dao import BrsEntityDAO
 from app.dao.models import Teacher, Subject, CurriculumUnit, TeacherCurriculumUnitLink
 
 
-class TeacherDAO:
-    def __init__(self, db: Session):
-        self.db = db
+class TeacherDAO(BrsEntityDAO):
+    model = Teacher
+    key_column = "person_id"
 
     def get_all_teachers(self):
         return self.db.query(Teacher).filter(Teacher.rank_short != "магистр").order_by(
@@ -38,9 +39,6 @@ class TeacherDAO:
     def add_teacher(self, teacher: Teacher):
         self.db.add(teacher)
 
-    def save_changes(self):
-        self.db.commit()
-
     def get_cur_unit_full_info_by_id(self, id_: int):
         unit = (
             self.db.query(CurriculumUnit)
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class MonthFilterMode(str, Enum):
+    """
+    Режим фильтрации статей по месяцам:
+    each_year — месяцы month_min..month_max внутри каждого года диапазона;
+    continuous — непрерывный период с (year_min, month_min) по (year_max, month_max),
+    поэтому month_min задаётся только вместе с year_min, а month_max — только вместе с year_max.
+    """
+    each_year = "each_year"
+    continuous = "continuous"
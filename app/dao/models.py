@@ -1,9 +1,17 @@
 from datetime import datetime
 import pytz as pytz
-from sqlalchemy import Column, Integer, String, Boolean, ARRAY, TEXT, ForeignKey, TIMESTAMP, DATE
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, ARRAY, TEXT, ForeignKey, TIMESTAMP, DATE, Index, \
+    Computed, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR, JSONB
+from sqlalchemy.orm import relationship, deferred, query_expression
 from app.dao.db_config import Base
 
+ARTICLE_SEARCH_CONFIG = "russian"
+ARTICLE_SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{ARTICLE_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{ARTICLE_SEARCH_CONFIG}', coalesce(content, '')), 'B')"
+)
+
 
 class Teacher(Base):
     __tablename__ = "teachers"
@@ -23,6 +31,7 @@ class Teacher(Base):
     rank_short = Column(String, nullable=True)
     surname = Column(String, nullable=False)
     brs_id = Column(Integer, nullable=False, unique=True)
+    brs_fingerprint = Column(String(64), nullable=True)
     curriculum_units = relationship("CurriculumUnit", back_populates="teacher")
     linked_units = relationship("TeacherCurriculumUnitLink", back_populates="teacher", cascade="all, delete")
 
@@ -51,6 +60,8 @@ class Article(Base):
     views = Column(Integer, default=0)
     content = Column(TEXT, nullable=True)
     event_date = Column(DATE, nullable=False)
+    search_vector = deferred(Column(TSVECTOR, Computed(ARTICLE_SEARCH_VECTOR, persisted=True)))
+    excerpt = query_expression()
     tag_associations = relationship(
         "ArticleTagAssociation", back_populates="article", cascade="all, delete-orphan"
     )
@@ -58,6 +69,11 @@ class Article(Base):
         "Tag", secondary="article_tag_association", back_populates="articles"
     )
 
+    __table_args__ = (
+        Index("ix_articles_event_date_id", "event_date", "id"),
+        Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 
 class ArticleTagAssociation(Base):
     __tablename__ = "article_tag_association"
@@ -79,6 +95,7 @@ class CurriculumUnit(Base):
     stud_group_brs_id = Column(Integer, ForeignKey('stud_groups.brs_id'), nullable=False)
     teacher_brs_id = Column(Integer, ForeignKey('teachers.brs_id'), nullable=False)
     subject_brs_id = Column(Integer, ForeignKey('subjects.brs_id'), nullable=False)
+    brs_fingerprint = Column(String(64), nullable=True)
     teacher = relationship("Teacher", back_populates="curriculum_units", primaryjoin="CurriculumUnit.teacher_brs_id==Teacher.brs_id")
     subject = relationship("Subject", back_populates="curriculum_units", primaryjoin="CurriculumUnit.subject_brs_id==Subject.brs_id")
     stud_group = relationship("StudGroup", back_populates="curriculum_units", primaryjoin="CurriculumUnit.stud_group_brs_id==StudGroup.brs_id")
@@ -91,6 +108,7 @@ class Subject(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     brs_id = Column(Integer, nullable=False, unique=True)
     name = Column(String, nullable=False)
+    brs_fingerprint = Column(String(64), nullable=True)
     curriculum_units = relationship("CurriculumUnit", back_populates="subject")
 
 
@@ -102,15 +120,19 @@ class StudGroup(Base):
     course = Column(Integer, nullable=False)
     semester = Column(Integer, nullable=False)
     education_level = Column(String, nullable=False)
+    brs_fingerprint = Column(String(64), nullable=True)
     curriculum_units = relationship("CurriculumUnit", back_populates="stud_group")
 
 
 class TeacherCurriculumUnitLink(Base):
     __tablename__ = "teacher_curriculum_unit_link"
+    __table_args__ = (
+        UniqueConstraint("teacher_id", "curriculum_unit_id", "is_practice", name="uq_teacher_curriculum_unit_link"),
+    )
     id = Column(Integer, primary_key=True, autoincrement=True)
     teacher_id = Column(Integer, ForeignKey("teachers.id", ondelete="CASCADE"), nullable=False)
     curriculum_unit_id = Column(Integer, ForeignKey("curriculum_units.id", ondelete="CASCADE"), nullable=False)
-    is_practice = Column(Boolean, default=False)
+    is_practice = Column(Boolean, nullable=False, default=False)
     teacher = relationship("Teacher", back_populates="linked_units")
     curriculum_unit = relationship("CurriculumUnit", back_populates="linked_teachers")
 
@@ -121,3 +143,36 @@ class AdminUser(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     username = Column(String, unique=True, nullable=False)
     password_hash = Column(String, nullable=False)
+
+
+class BrsProbeState(Base):
+    """
+    Последняя пара (год, сессия), для которой источник БРС вернул данные.
+    """
+    __tablename__ = "brs_probe_states"
+
+    source = Column(String, primary_key=True)
+    year = Column(Integer, nullable=False)
+    session_num = Column(Integer, nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), nullable=False,
+                        default=lambda: datetime.now(pytz.timezone('Europe/Moscow')))
+
+
+class SyncJob(Base):
+    """
+    Запуск полной синхронизации с БРС: фаза, число строк по таблицам и длительность фаз.
+    """
+    __tablename__ = "sync_jobs"
+    __table_args__ = (
+        Index("ix_sync_jobs_status", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    status = Column(String, nullable=False)
+    phase = Column(String, nullable=True)
+    stats = Column(JSONB, nullable=True)
+    timings = Column(JSONB, nullable=False, default=dict)
+    error = Column(TEXT, nullable=True)
+    started_at = Column(TIMESTAMP(timezone=True), nullable=False,
+                        default=lambda: datetime.now(pytz.timezone('Europe/Moscow')))
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True)
@@ -4,10 +4,10 @@ from sqlalchemy.orm import Session
 from app.dao.session import get_db
 from app.service.article_service import ArticleService
 from app.service.auth_service import AdminUserService
-from app.service.common.data_sync_manager import DataSyncManager
 from app.service.cur_unit_service import CurriculumUnitService
 from app.service.stud_group_service import StudGroupService
 from app.service.subject_service import SubjectService
+from app.service.sync_job_service import SyncJobService
 from app.service.tag_service import TagService
 from app.service.teacher_service import TeacherService
 
@@ -36,8 +36,8 @@ def get_stud_group_service(db: Session = Depends(get_db)) -> StudGroupService:
     return StudGroupService(db)
 
 
-def get_data_sync_manager(db: Session = Depends(get_db)) -> DataSyncManager:
-    return DataSyncManager(db)
+def get_sync_job_service(db: Session = Depends(get_db)) -> SyncJobService:
+    return SyncJobService(db)
 
 
 def get_admin_user_service(db: Session = Depends(get_db)) -> AdminUserService:
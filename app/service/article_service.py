@@ -1,10 +1,14 @@
 from datetime import datetime
-from fastapi import UploadFile
 from sqlalchemy.orm import Session
-from app.api.dto import ArticleBase, ArticleResponse
-from app.dao.entities.article_dao import ArticleDAO
+from app.api.dto import ArticleBase, ArticleResponse, MonthFilterMode, ArticlePage, ArticleView, \
+    ArticleSummaryResponse, ArticleFacetsResponse, TagFacet, YearFacet, MonthFacet
+from app.dao.entities.article_dao import ArticleDAO, event_date_ranges, moscow_today, EXCERPT_LENGTH
 from app.dao.models import Article, ArticleTagAssociation
-from app.service.common.utils import save_icon_file
+from app.service.common.cache import latest_articles_cache, article_facets_cache, popular_articles_cache
+from app.service.common.tag_index import tag_index
+from app.service.common.view_counter import view_counter
+from app.service.common.utils import make_excerpt, encode_cursor, decode_cursor, encode_search_cursor, \
+    decode_search_cursor
 
 
 class ArticleService:
@@ -21,11 +25,34 @@ class ArticleService:
         del article_dict["tag_ids"]
         new_article = Article(**article_dict, tag_associations=associations)
         saved_article = self.dao.create_article(new_article)
+        self._invalidate_caches()
         return self.to_response_dto(saved_article)
 
     def get_latest_articles(self, limit: int = 6):
-        articles = self.dao.get_latest_articles(limit)
-        return [self.to_response_dto(a) for a in articles]
+        """
+        Последние статьи кэшируются на текущие сутки по Москве и сбрасываются при изменении статей.
+        """
+        return latest_articles_cache.get(
+            (moscow_today(), limit),
+            lambda: [self.to_summary_dto(a) for a in self.dao.get_latest_articles(limit)]
+        )
+
+    def get_popular_articles(self, limit: int = 6):
+        """
+        Сортировка по просмотрам идёт по всей таблице без индекса, поэтому результат кэшируется.
+        Просмотры и так попадают в БД с задержкой, а кэш обновляется по TTL и при изменении статей.
+        """
+        return popular_articles_cache.get(
+            limit,
+            lambda: [self.to_summary_dto(a) for a in self.dao.get_popular_articles(limit)]
+        )
+
+    @staticmethod
+    def register_view(article_id: int):
+        """
+        Учитывает просмотр статьи. В БД просмотры попадают при периодическом сбросе буфера.
+        """
+        view_counter.record(article_id)
 
     def get_article_by_id(self, article_id: int):
         article = self.dao.get_article_by_id(article_id)
@@ -41,15 +68,134 @@ class ArticleService:
             month_max: int | None,
             tags: list[str] | None,
             page: int,
-            limit: int
+            limit: int,
+            month_mode: MonthFilterMode = MonthFilterMode.each_year
     ):
-        articles = self.dao.get_filtered_articles(year_min, year_max, month_min, month_max, tags, page, limit)
-        return [self.to_response_dto(a) for a in articles]
+        return self.get_articles_page(year_min, year_max, month_min, month_max, tags, page, limit, month_mode).items
+
+    def get_articles_page(
+            self,
+            year_min: int | None,
+            year_max: int | None,
+            month_min: int | None,
+            month_max: int | None,
+            tags: list[str] | None,
+            page: int,
+            limit: int,
+            month_mode: MonthFilterMode = MonthFilterMode.each_year,
+            cursor: str | None = None,
+            view: ArticleView = ArticleView.full
+    ) -> ArticlePage:
+        """
+        Возвращает страницу статей. Если передан `cursor`, страница выбирается по ключу (event_date, id),
+        иначе — по номеру `page`. В обоих случаях возвращается курсор на следующую страницу.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        summary = view == ArticleView.summary
+        offset = (page - 1) * limit
+        # Запрашиваем на одну статью больше, чтобы понять, есть ли следующая страница
+        if tags:
+            date_ranges, months = event_date_ranges(year_min, year_max, month_min, month_max, month_mode)
+            article_ids = tag_index.find_articles(self.dao, tags, date_ranges, months, offset, limit + 1, after)
+            articles_by_id = {a.id: a for a in self.dao.get_articles_by_ids(article_ids, summary)} if article_ids else {}
+            articles = [articles_by_id[i] for i in article_ids if i in articles_by_id]
+        else:
+            articles = self.dao.get_filtered_articles(year_min, year_max, month_min, month_max, offset, limit + 1,
+                                                      month_mode, after, summary)
+        next_cursor = None
+        if len(articles) > limit:
+            articles = articles[:limit]
+            last = articles[-1]
+            next_cursor = encode_cursor(last.event_date, last.id)
+        to_dto = self.to_summary_dto if summary else self.to_response_dto
+        return ArticlePage(items=[to_dto(a) for a in articles], next_cursor=next_cursor)
+
+    def search_articles(
+            self,
+            text: str,
+            year_min: int | None,
+            year_max: int | None,
+            month_min: int | None,
+            month_max: int | None,
+            tags: list[str] | None,
+            limit: int,
+            month_mode: MonthFilterMode = MonthFilterMode.each_year,
+            cursor: str | None = None,
+            view: ArticleView = ArticleView.full
+    ) -> ArticlePage:
+        """
+        Ищет статьи по тексту с теми же фильтрами, что и get_filtered_articles.
+        Результаты отсортированы по релевантности и листаются курсором.
+        """
+        after = decode_search_cursor(cursor) if cursor else None
+        summary = view == ArticleView.summary
+        article_ids = None
+        if tags:
+            article_ids = tag_index.article_ids(self.dao, tags)
+            if not article_ids:
+                return ArticlePage(items=[])
+        found = self.dao.search_articles(text, year_min, year_max, month_min, month_max, limit + 1, month_mode,
+                                         article_ids, after, summary)
+        next_cursor = None
+        if len(found) > limit:
+            found = found[:limit]
+            last, last_rank = found[-1]
+            next_cursor = encode_search_cursor(last_rank, last.id)
+        to_dto = self.to_summary_dto if summary else self.to_response_dto
+        return ArticlePage(items=[to_dto(a) for a, _ in found], next_cursor=next_cursor)
+
+    def get_facets(
+            self,
+            year_min: int | None,
+            year_max: int | None,
+            month_min: int | None,
+            month_max: int | None,
+            tags: list[str] | None,
+            month_mode: MonthFilterMode = MonthFilterMode.each_year
+    ) -> ArticleFacetsResponse:
+        """
+        Количество статей по тегам и по годам/месяцам с учётом выбранных фильтров. Результат кэшируется.
+        """
+        key = (year_min, year_max, month_min, month_max, month_mode, tuple(sorted(set(tags or []))))
+        return article_facets_cache.get(
+            key,
+            lambda: self._compute_facets(year_min, year_max, month_min, month_max, tags, month_mode)
+        )
+
+    def _compute_facets(
+            self,
+            year_min: int | None,
+            year_max: int | None,
+            month_min: int | None,
+            month_max: int | None,
+            tags: list[str] | None,
+            month_mode: MonthFilterMode
+    ) -> ArticleFacetsResponse:
+        article_ids = None
+        if tags:
+            article_ids = tag_index.article_ids(self.dao, tags)
+            if not article_ids:
+                return ArticleFacetsResponse(tags=[], years=[])
+        tag_facets = []
+        years = {}
+        months = []
+        for kind, tag_id, tag_name, year, month, count in self.dao.get_facet_counts(
+                year_min, year_max, month_min, month_max, month_mode, article_ids):
+            if kind == "tag":
+                tag_facets.append(TagFacet(id=tag_id, name=tag_name, count=count))
+            elif kind == "year":
+                years[year] = YearFacet(year=year, count=count, months=[])
+            else:
+                months.append((year, MonthFacet(month=month, count=count)))
+        for year, month_facet in sorted(months, key=lambda item: (item[0], item[1].month)):
+            years[year].months.append(month_facet)
+        tag_facets.sort(key=lambda facet: (-facet.count, facet.name))
+        return ArticleFacetsResponse(tags=tag_facets, years=[years[year] for year in sorted(years, reverse=True)])
 
     def update_article_with_optional_fields(
             self,
             article_id: int,
-            icon: UploadFile = None,
+            icon_path: str = None,
             title: str = None,
             content: str = None,
             tag_ids: list[int] = None,
@@ -58,8 +204,8 @@ class ArticleService:
         article = self.dao.get_article_by_id(article_id)
         if not article:
             return None
-        if icon and icon.filename:
-            article.icon = save_icon_file(icon, prefix=title or article.title)
+        if icon_path:
+            article.icon = icon_path
         if title not in (None, "", "null"):
             article.title = title
         if content not in (None, "", "null"):
@@ -70,6 +216,7 @@ class ArticleService:
         if event_date not in (None, "", "null"):
             article.event_date = datetime.fromisoformat(event_date).date()
         updated_article = self.dao.update_article(article)
+        self._invalidate_caches()
         return self.to_response_dto(updated_article)
 
     def delete_article(self, article_id: int):
@@ -77,8 +224,16 @@ class ArticleService:
         if not article:
             return False
         self.dao.delete_article(article)
+        self._invalidate_caches()
         return True
 
+    @staticmethod
+    def _invalidate_caches():
+        tag_index.invalidate()
+        latest_articles_cache.invalidate()
+        article_facets_cache.invalidate()
+        popular_articles_cache.invalidate()
+
     @staticmethod
     def to_response_dto(article: Article) -> ArticleResponse:
         return ArticleResponse(
@@ -91,3 +246,19 @@ class ArticleService:
             created_at=article.created_at,
             views=article.views,
         )
+
+    @staticmethod
+    def to_summary_dto(article: Article) -> ArticleSummaryResponse:
+        """
+        Собирает DTO без полного текста: content не должен загружаться из БД.
+        """
+        return ArticleSummaryResponse(
+            id=article.id,
+            icon=article.icon,
+            title=article.title,
+            tag_ids=[tag.id for tag in article.tags],
+            event_date=article.event_date,
+            created_at=article.created_at,
+            views=article.views,
+            excerpt=make_excerpt(article.excerpt, EXCERPT_LENGTH),
+        )
@@ -0,0 +1,167 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import BinaryIO, Callable
+from urllib.parse import urlsplit
+import httpx
+from app.config.config import settings
+from app.service.common.metrics import metrics
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Момент (по time.monotonic), после которого запросы к БРС в текущей синхронизации не выполняются
+_sync_deadline: ContextVar[float | None] = ContextVar("brs_sync_deadline", default=None)
+
+
+class BrsDeadlineExceeded(RuntimeError):
+    pass
+
+
+@contextmanager
+def sync_deadline(seconds: float):
+    """
+    Ограничивает общее время всех запросов к БРС внутри блока.
+    Срок хранится в contextvar, поэтому в пул потоков задачи нужно передавать через contextvars.copy_context().run.
+    """
+    token = _sync_deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _sync_deadline.reset(token)
+
+
+def _trace(event_name: str, info: dict):
+    # Расширение trace в httpx: события транспорта, в том числе установка нового соединения
+    if event_name == "connection.connect_tcp.complete":
+        metrics.increment("brs.connections")
+
+
+_TRACE = {"trace": _trace}
+
+
+class BrsClient:
+    """
+    Общий HTTP-клиент БРС: пул keep-alive соединений, тайм-ауты на запрос и на всю синхронизацию,
+    повтор GET-запросов с экспоненциальной задержкой и случайным разбросом при сетевых ошибках и ответах 5xx/429.
+    Длительность запросов пишется в metrics под именем "brs.<endpoint>", число открытых TCP-соединений —
+    в счётчик "brs.connections" (при переиспользовании соединений он растёт медленнее числа запросов).
+    """
+
+    def __init__(
+            self,
+            timeout: float,
+            connect_timeout: float,
+            max_retries: int,
+            retry_base_delay: float,
+            retry_max_delay: float,
+            max_connections: int,
+    ):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.max_connections = max_connections
+        self._client: httpx.Client | None = None
+        self._lock = threading.Lock()
+
+    def get(self, url: str, endpoint: str | None = None) -> httpx.Response:
+        """
+        Выполняет GET-запрос с повторами. Возвращает последний ответ (в том числе 4xx и 5xx после всех попыток),
+        сетевую ошибку последней попытки пробрасывает.
+        """
+        return self._request(
+            url, endpoint, lambda client, timeout: client.get(url, timeout=timeout, extensions=_TRACE)
+        )
+
+    def download(self, url: str, destination: BinaryIO, endpoint: str | None = None) -> int:
+        """
+        Выполняет GET-запрос с теми же повторами, что и get, и по частям записывает тело ответа в `destination`,
+        не загружая его в память целиком. Перед каждой попыткой файл очищается. Возвращает код последнего ответа.
+        """
+        def send(client: httpx.Client, timeout: httpx.Timeout) -> httpx.Response:
+            destination.seek(0)
+            destination.truncate()
+            with client.stream("GET", url, timeout=timeout, extensions=_TRACE) as response:
+                for chunk in response.iter_bytes():
+                    destination.write(chunk)
+            return response
+
+        return self._request(url, endpoint, send).status_code
+
+    def _request(
+            self,
+            url: str,
+            endpoint: str | None,
+            send: Callable[[httpx.Client, httpx.Timeout], httpx.Response],
+    ) -> httpx.Response:
+        endpoint = endpoint or urlsplit(url).path
+        attempt = 0
+        while True:
+            timeout = self._request_timeout()
+            started = time.monotonic()
+            try:
+                response = send(
+                    self._get_client(), httpx.Timeout(timeout, connect=min(timeout, self.connect_timeout))
+                )
+            except httpx.TransportError:
+                metrics.increment(f"brs.{endpoint}.errors")
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                metrics.observe(f"brs.{endpoint}", time.monotonic() - started)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                metrics.increment(f"brs.{endpoint}.errors")
+            attempt += 1
+            metrics.increment(f"brs.{endpoint}.retries")
+            self._sleep_before_retry(attempt)
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _get_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                )
+            return self._client
+
+    def _request_timeout(self) -> float:
+        remaining = self._remaining()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            raise BrsDeadlineExceeded("BRS sync deadline exceeded")
+        return min(self.timeout, remaining)
+
+    def _sleep_before_retry(self, attempt: int):
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempt - 1)))
+        remaining = self._remaining()
+        if remaining is not None and remaining <= delay:
+            raise BrsDeadlineExceeded("BRS sync deadline exceeded")
+        time.sleep(delay)
+
+    @staticmethod
+    def _remaining() -> float | None:
+        deadline = _sync_deadline.get()
+        return None if deadline is None else deadline - time.monotonic()
+
+
+brs_client = BrsClient(
+    timeout=settings.BRS_TIMEOUT_SECONDS,
+    connect_timeout=settings.BRS_CONNECT_TIMEOUT_SECONDS,
+    max_retries=settings.BRS_MAX_RETRIES,
+    retry_base_delay=settings.BRS_RETRY_BASE_DELAY_SECONDS,
+    retry_max_delay=settings.BRS_RETRY_MAX_DELAY_SECONDS,
+    max_connections=settings.BRS_MAX_CONNECTIONS,
+)
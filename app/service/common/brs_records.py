@@ -0,0 +1,50 @@
+import hashlib
+import json
+from app.dao.models import Teacher, CurriculumUnit
+
+FIELD_RENAMES = {
+    CurriculumUnit: {
+        "practice_teacher_ids": "practice_teacher_brs_ids",
+        "stud_group_id": "stud_group_brs_id",
+        "subject_id": "subject_brs_id",
+        "teacher_id": "teacher_brs_id",
+    }
+}
+# Поля, которые не входят в отпечаток записи БРС: иконку преподавателя синхронизация не меняет
+FINGERPRINT_EXCLUDED_FIELDS = {
+    Teacher: {"icon"},
+}
+
+
+def to_sync_row(model, item: dict, model_columns: set[str] | None = None) -> dict:
+    """
+    Приводит запись БРС к колонкам `model` и добавляет её отпечаток.
+    По умолчанию берутся все колонки модели, кроме id и brs_fingerprint.
+    """
+    if model_columns is None:
+        model_columns = {col.name for col in model.__table__.columns} - {"id", "brs_fingerprint"}
+    item = dict(item)
+    item["brs_id"] = item.pop("id")
+    for old_key, new_key in FIELD_RENAMES.get(model, {}).items():
+        if old_key in item:
+            item[new_key] = item.pop(old_key)
+    item = {key: value for key, value in item.items() if key in model_columns}
+    item["brs_fingerprint"] = brs_fingerprint(model, item)
+    return item
+
+
+def record_fingerprint(model, item: dict) -> str:
+    """
+    Отпечаток записи БРС в том виде, в каком его сохраняет полная синхронизация.
+    """
+    return to_sync_row(model, item)["brs_fingerprint"]
+
+
+def brs_fingerprint(model, item: dict) -> str:
+    """
+    Стабильный отпечаток записи БРС: SHA-256 от JSON с отсортированными ключами.
+    """
+    excluded = FINGERPRINT_EXCLUDED_FIELDS.get(model, set()) | {"brs_fingerprint"}
+    payload = {key: value for key, value in item.items() if key not in excluded}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Any, Callable, Hashable
+from app.config.config import settings
+
+
+class _CacheEntry:
+    def __init__(self, value: Any, generation: int):
+        self.value = value
+        self.generation = generation
+        self.created_at = time.monotonic()
+
+
+class RefreshableCache:
+    """
+    Кэш вычисляемых значений в памяти процесса с явной инвалидацией и TTL.
+    После инвалидации старое значение не выбрасывается: пока один запрос пересчитывает его,
+    остальные получают устаревшее значение (stale-while-revalidate) и не нагружают БД.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 128):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[Hashable, _CacheEntry] = {}
+        self._refreshing: set[Hashable] = set()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry):
+                return entry.value
+            if entry is not None and key in self._refreshing:
+                return entry.value
+            self._refreshing.add(key)
+            generation = self._generation
+        try:
+            value = loader()
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current.generation <= generation:
+                self._entries.pop(key, None)
+                self._entries[key] = _CacheEntry(value, generation)
+                while len(self._entries) > self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+        return value
+
+    def _is_fresh(self, entry: _CacheEntry) -> bool:
+        return entry.generation == self._generation and time.monotonic() - entry.created_at < self.ttl_seconds
+
+
+latest_articles_cache = RefreshableCache(settings.LATEST_ARTICLES_CACHE_TTL_SECONDS, max_entries=4)
+article_facets_cache = RefreshableCache(settings.ARTICLE_FACETS_CACHE_TTL_SECONDS)
+popular_articles_cache = RefreshableCache(settings.POPULAR_ARTICLES_CACHE_TTL_SECONDS, max_entries=4)
@@ -1,129 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Iterable
 from sqlalchemy.orm import Session
 from app.config.config import settings
+from app.dao.entities.brs_probe_state_dao import BrsProbeStateDAO
+from app.dao.entities.brs_sync_dao import BrsSyncDAO
 from app.dao.models import TeacherCurriculumUnitLink, StudGroup, Subject, Teacher, CurriculumUnit
+from app.service.common.brs_client import sync_deadline
+from app.service.common.brs_records import to_sync_row
+from app.service.common.metrics import metrics
+from app.service.common.utils import ProbeResult, SpooledProbeResult, chunked
 from app.service.cur_unit_service import CurriculumUnitService
 from app.service.stud_group_service import StudGroupService
 from app.service.subject_service import SubjectService
 from app.service.teacher_service import TeacherService
 
 
+# Иконки по умолчанию для новых преподавателей по полу
+DEFAULT_TEACHER_ICONS = {
+    "M": settings.DEFAULT_MAN_ICON,
+    "W": settings.DEFAULT_WOMAN_ICON,
+}
+STUD_GROUPS_SOURCE = "stud_groups"
+CUR_UNITS_SOURCE = "curriculum_units"
+
+
 class DataSyncManager:
     def __init__(self, db: Session):
         self.db = db
+        self.probe_state_dao = BrsProbeStateDAO(db)
+        self.sync_dao = BrsSyncDAO(db)
         self.teacher_service = TeacherService(db)
         self.subject_service = SubjectService(db)
         self.stud_group_service = StudGroupService(db)
         self.curriculum_unit_service = CurriculumUnitService(db)
 
-    def sync_all(self):
+    def sync_all(self, progress: Callable[[str], None] | None = None) -> dict[str, dict[str, int]]:
+        """
+        Синхронизирует преподавателей, дисциплины, группы и учебные единицы с БРС.
+        `progress` вызывается с названием фазы: fetching, writing, linking.
+        Возвращает по каждой таблице число добавленных, обновлённых, удалённых и неизменившихся строк.
+        """
+        progress = progress or (lambda phase: None)
+        progress("fetching")
         with self.db.begin():
-            teachers = self.teacher_service.fetch_teachers_from_api(settings.TEACHERS_URI)
-            subjects = self.subject_service.fetch_subjects(settings.SUBJECTS_URI)
-            groups = self.stud_group_service.fetch_groups(settings.STUB_GROUPS_URI)
-            units = self.curriculum_unit_service.fetch_units(settings.CUR_UNITS_URI)
-            self._clean_links(teachers, units)
-            self._sync_entities(Teacher, teachers, 'brs_id')
-            self._sync_entities(Subject, subjects, 'brs_id')
-            self._sync_entities(StudGroup, groups, 'brs_id')
-            self._sync_entities(CurriculumUnit, units, 'brs_id')
-            self.db.flush()
-            self._rebuild_links()
-
-    def _clean_links(self, teachers: list[dict], units: list[dict]):
-        teacher_brs_ids = {t["id"] for t in teachers}
-        unit_brs_ids = {u["id"] for u in units}
-        teacher_ids = [t.id for t in self.db.query(Teacher).filter(~Teacher.brs_id.in_(teacher_brs_ids))]
-        unit_ids = [u.id for u in self.db.query(CurriculumUnit).filter(~CurriculumUnit.brs_id.in_(unit_brs_ids))]
-        if teacher_ids:
-            self.db.query(TeacherCurriculumUnitLink).filter(
-                TeacherCurriculumUnitLink.teacher_id.in_(teacher_ids)
-            ).delete(synchronize_session=False)
-        if unit_ids:
-            self.db.query(TeacherCurriculumUnitLink).filter(
-                TeacherCurriculumUnitLink.curriculum_unit_id.in_(unit_ids)
-            ).delete(synchronize_session=False)
-
-    def _sync_entities(self, model, new_data: list[dict], brs_field: str):
-        existing = {
-            getattr(obj, brs_field): obj
-            for obj in self.db.query(model).all()
-        }
-        new_ids = set()
+            last_found = self.probe_state_dao.get_last_found()
+        # Данные из БРС загружаются до открытия транзакции: она длится столько же, сколько запись
+        teachers, subjects, groups, units = self._fetch_all(last_found)
+        progress("writing")
+        try:
+            with self.db.begin():
+                report = {}
+                # Сначала вставляются справочники, на которые ссылаются учебные единицы, удаление — в обратном порядке
+                for model, new_data in (
+                        (Teacher, teachers),
+                        (Subject, subjects),
+                        (StudGroup, groups.items),
+                        (CurriculumUnit, units if isinstance(units, SpooledProbeResult) else units.items),
+                ):
+                    if isinstance(new_data, SpooledProbeResult):
+                        total = self._stream_entities(model, new_data.iter_items())
+                    else:
+                        total = self._stage_entities(model, new_data)
+                    inserted, updated = self.sync_dao.upsert_staged(
+                        model, default_icons=DEFAULT_TEACHER_ICONS if model is Teacher else None
+                    )
+                    report[model.__tablename__] = {
+                        "inserted": inserted,
+                        "updated": updated,
+                        "deleted": 0,
+                        "unchanged": total - inserted - updated,
+                    }
+                for model in (CurriculumUnit, StudGroup, Subject, Teacher):
+                    report[model.__tablename__]["deleted"] = self.sync_dao.delete_missing(model)
+                progress("linking")
+                links_inserted, links_deleted = self.sync_dao.rebuild_teacher_links()
+                report[TeacherCurriculumUnitLink.__tablename__] = {
+                    "inserted": links_inserted, "deleted": links_deleted
+                }
+                for source, result in ((STUD_GROUPS_SOURCE, groups), (CUR_UNITS_SOURCE, units)):
+                    self.probe_state_dao.save_last_found(source, *result.found)
+        finally:
+            if isinstance(units, SpooledProbeResult):
+                units.close()
+        for table, stats in report.items():
+            for name, count in stats.items():
+                metrics.increment(f"sync.{table}.{name}", count)
+        return report
 
-        FIELD_RENAMES = {
-            CurriculumUnit: {
-                "practice_teacher_ids": "practice_teacher_brs_ids",
-                "stud_group_id": "stud_group_brs_id",
-                "subject_id": "subject_brs_id",
-                "teacher_id": "teacher_brs_id",
-            }
-        }
-        model_columns = {col.name for col in model.__table__.columns}
+    def _fetch_all(
+            self, last_found: dict[str, tuple[int, int]]
+    ) -> tuple[list[dict], list[dict], ProbeResult, ProbeResult | SpooledProbeResult]:
+        """
+        Параллельно загружает преподавателей, дисциплины, группы и учебные единицы из БРС.
+        Поиск года и сессии для групп и учебных единиц начинается с последней удачной пары из `last_found`.
+        С SYNC_STREAM_CURRICULUM_UNITS ответы с учебными единицами не разбираются, а сохраняются во временные файлы.
+        Ошибка любого из запросов или истечение BRS_SYNC_DEADLINE_SECONDS прерывает синхронизацию
+        до начала записи в БД.
+        """
+        with sync_deadline(settings.BRS_SYNC_DEADLINE_SECONDS), \
+                ThreadPoolExecutor(max_workers=4, thread_name_prefix="brs-fetch") as pool:
+            futures = (
+                pool.submit(copy_context().run, self.teacher_service.fetch_teachers_from_api, settings.TEACHERS_URI),
+                pool.submit(copy_context().run, self.subject_service.fetch_subjects, settings.SUBJECTS_URI),
+                pool.submit(
+                    copy_context().run, self.stud_group_service.fetch_groups,
+                    settings.STUB_GROUPS_URI, last_found.get(STUD_GROUPS_SOURCE)
+                ),
+                pool.submit(
+                    copy_context().run,
+                    self.curriculum_unit_service.spool_units if settings.SYNC_STREAM_CURRICULUM_UNITS
+                    else self.curriculum_unit_service.fetch_units,
+                    settings.CUR_UNITS_URI, last_found.get(CUR_UNITS_SOURCE)
+                ),
+            )
+            teachers, subjects, groups, units = (future.result() for future in futures)
+        return teachers, subjects, groups, units
 
+    def _stage_entities(self, model, new_data: list[dict]) -> int:
+        """
+        Приводит записи БРС к колонкам `model`, считает отпечатки и загружает их во временную таблицу.
+        Возвращает число загруженных строк.
+        """
+        model_columns = {col.name for col in model.__table__.columns} - {"id", "brs_fingerprint"}
+        rows = {}
         for item in new_data:
-            brs_id = item.get("id")
-            new_ids.add(brs_id)
-            obj = existing.get(brs_id)
-            item["brs_id"] = item.pop("id")
+            row = to_sync_row(model, item, model_columns)
+            rows[row["brs_id"]] = row
 
-            for old_key, new_key in FIELD_RENAMES.get(model, {}).items():
-                if old_key in item:
-                    item[new_key] = item.pop(old_key)
-            item = {key: value for key, value in item.items() if key in model_columns}
-            if obj:
-                for key, value in item.items():
-                    if model is Teacher and key == "icon":
-                        continue  # иконку преподавателя не трогаем
-                    setattr(obj, key, value)
-            else:
-                # Логика только для новых учителей
-                if model is Teacher:
-                    gender = item.get("gender")
-                    if "icon" not in item or item["icon"] is None:
-                        if gender == "M":
-                            item["icon"] = settings.DEFAULT_MAN_ICON
-                        elif gender == "W":
-                            item["icon"] = settings.DEFAULT_WOMAN_ICON
+        columns = {"brs_id", "brs_fingerprint"}.union(*rows.values())
+        if model is Teacher:
+            columns.add("icon")
+        for row in rows.values():
+            _fill_defaults(model, row, columns)
+        self.sync_dao.stage(model, list(rows.values()), sorted(columns))
+        return len(rows)
 
-                self.db.add(model(**item))
+    def _stream_entities(self, model, new_data: Iterable[dict]) -> int:
+        """
+        Потоковый вариант _stage_entities: записи загружаются во временную таблицу пачками по SYNC_STREAM_CHUNK_SIZE,
+        и в памяти, кроме пачки, остаётся только карта brs_id → первые 8 байт отпечатка. По ней отбрасываются
+        точные повторы записей, а из повторов с другими данными upsert_staged берёт последний.
+        Загружаются все колонки модели, поэтому режим подходит только для таблиц, целиком заполняемых из БРС.
+        Возвращает число различных brs_id.
+        """
+        columns = sorted({col.name for col in model.__table__.columns} - {"id"})
+        model_columns = set(columns) - {"brs_fingerprint"}
+        fingerprints: dict[int, int] = {}
+        self.sync_dao.create_staging(model, columns, keep_last=True)
+        for chunk in chunked(new_data, settings.SYNC_STREAM_CHUNK_SIZE):
+            rows = []
+            for item in chunk:
+                row = to_sync_row(model, item, model_columns)
+                fingerprint = int(row["brs_fingerprint"][:16], 16)
+                if fingerprints.get(row["brs_id"]) == fingerprint:
+                    continue
+                fingerprints[row["brs_id"]] = fingerprint
+                _fill_defaults(model, row, columns)
+                rows.append(row)
+            self.sync_dao.copy_to_staging(model, rows)
+        return len(fingerprints)
 
-        to_delete = [obj for brs, obj in existing.items() if brs not in new_ids]
-        for obj in to_delete:
-            self.db.delete(obj)
 
-    def _rebuild_links(self):
-        teachers_by_brs_id = {
-            t.brs_id: t.id
-            for t in self.db.query(Teacher.id, Teacher.brs_id).all()
-        }
-        existing_links = {
-            (link.teacher_id, link.curriculum_unit_id, link.is_practice)
-            for link in self.db.query(
-                TeacherCurriculumUnitLink.teacher_id,
-                TeacherCurriculumUnitLink.curriculum_unit_id,
-                TeacherCurriculumUnitLink.is_practice
-            ).all()
-        }
-        curriculum_units = self.db.query(CurriculumUnit).all()
-        new_links = []
-        for unit in curriculum_units:
-            main_id = teachers_by_brs_id.get(unit.teacher_brs_id)
-            if main_id:
-                key = (main_id, unit.id, False)
-                if key not in existing_links:
-                    new_links.append(TeacherCurriculumUnitLink(
-                        teacher_id=main_id,
-                        curriculum_unit_id=unit.id,
-                        is_practice=False
-                    ))
-            for brs_id in unit.practice_teacher_brs_ids or []:
-                practice_id = teachers_by_brs_id.get(brs_id)
-                if practice_id:
-                    key = (practice_id, unit.id, True)
-                    if key not in existing_links:
-                        new_links.append(TeacherCurriculumUnitLink(
-                            teacher_id=practice_id,
-                            curriculum_unit_id=unit.id,
-                            is_practice=True
-                        ))
-        self.db.bulk_save_objects(new_links)
+def _fill_defaults(model, row: dict, columns: Iterable[str]):
+    for name in columns:
+        if name not in row:
+            default = model.__table__.c[name].default
+            row[name] = default.arg if default is not None and default.is_scalar else None
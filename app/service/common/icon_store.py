@@ -0,0 +1,74 @@
+import os
+import re
+import time
+from sqlalchemy.orm import Session
+from app.config.config import settings
+from app.dao.entities.icon_dao import IconDAO
+from app.service.common.images import ICONS_URL_PREFIX, icon_digest, file_digest
+from app.service.common.metrics import metrics
+
+# Загрузки до перехода на версии с хэшем в имени: "<prefix>_<исходное имя>" с расширением изображения
+_LEGACY_UPLOAD_NAME_RE = re.compile(
+    r"^[^.][^/]*_[^/]*\.(png|jpe?g|gif|webp|bmp|tiff?|svg|ico|avif|heic)$", re.IGNORECASE
+)
+# Иконки по умолчанию из resources/static/icons: под шаблон старых загрузок подходит и default_article.png
+_BUNDLED_ICONS = frozenset({"default_article.png", "man.png", "woman.png"})
+_PRECOMPRESSED_SUFFIXES = (".br", ".gz")
+# Временные файлы _save_atomically, оставшиеся после падения процесса
+_TEMP_SUFFIX = ".tmp"
+
+
+def collect_icon_garbage(db: Session, batch_size: int, grace_seconds: int) -> int:
+    """
+    Удаляет из UPLOAD_DIR файлы иконок, на которые не ссылается ни `Teacher.icon`, ни `Article.icon`.
+    Рассматриваются версии, сохранённые render_icon, загрузки старого формата "<prefix>_<имя>" и их предсжатые
+    копии (.br, .gz), а также временные файлы *.tmp; скрытые файлы (.gitkeep) и прочие файлы не трогаются.
+    Версии иконки хранятся под хэшем содержимого, поэтому ссылка на основную версию сохраняет все версии
+    с тем же хэшем, а предсжатая копия живёт, пока есть ссылка на исходный файл. Иконки по умолчанию
+    (поставляемые и заданные в настройках) не удаляются никогда.
+
+    Файлы моложе `grace_seconds` пропускаются: загрузка могла сохранить их, но ещё не записать ссылку в БД
+    (при повторной загрузке того же изображения время изменения обновляется в render_icon).
+    За один вызов удаляется не больше `batch_size` файлов. Возвращает число удалённых файлов.
+    """
+    referenced = IconDAO(db).get_referenced_icons()
+    referenced.update(filter(None, (
+        settings.DEFAULT_ARTICLE_ICON, settings.DEFAULT_MAN_ICON, settings.DEFAULT_WOMAN_ICON
+    )))
+    referenced_digests = {icon_digest(path) for path in referenced} - {None}
+    referenced_names = {path[len(ICONS_URL_PREFIX):] for path in referenced if path.startswith(ICONS_URL_PREFIX)}
+
+    deadline = time.time() - grace_seconds
+    deleted = 0
+    with os.scandir(settings.UPLOAD_DIR) as entries:
+        for entry in entries:
+            if deleted >= batch_size:
+                break
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if not entry.name.endswith(_TEMP_SUFFIX):
+                icon_name = _collectable_icon_name(entry.name)
+                if icon_name is None:
+                    continue
+                if icon_name in referenced_names or file_digest(icon_name) in referenced_digests:
+                    continue
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime > deadline:
+                    continue
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            deleted += 1
+    metrics.increment("icon_gc.deleted", deleted)
+    return deleted
+
+
+def _collectable_icon_name(filename: str) -> str | None:
+    # Для предсжатой копии решают ссылки на исходный файл
+    if filename.endswith(_PRECOMPRESSED_SUFFIXES):
+        filename = filename.rsplit(".", 1)[0]
+    if filename in _BUNDLED_ICONS:
+        return None
+    if file_digest(filename) is not None or _LEGACY_UPLOAD_NAME_RE.match(filename) is not None:
+        return filename
+    return None
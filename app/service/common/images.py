@@ -0,0 +1,110 @@
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.config.config import settings
+
+ICONS_URL_PREFIX = "/static/icons/"
+# Название версии -> максимальная сторона в пикселях
+RENDITIONS = {
+    "thumb": 160,
+    "card": 640,
+    "full": 1600,
+}
+MAIN_RENDITION = "full"
+WEBP_QUALITY = 82
+JPEG_QUALITY = 85
+
+_ICON_NAME_RE = re.compile(r"^([0-9a-f]{32})-" + MAIN_RENDITION + r"\.(jpg|png)$")
+_RENDITION_NAME_RE = re.compile(r"^([0-9a-f]{32})-[a-z]+\.(webp|jpg|png)$")
+
+image_pool = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="images")
+
+
+def render_icon(source: str | BinaryIO, digest: str) -> str:
+    """
+    Декодирует загруженное изображение один раз, убирает метаданные и сохраняет версии
+    из RENDITIONS в WebP и в запасном формате (JPEG, либо PNG для изображений с прозрачностью).
+    Имена файлов строятся по хэшу содержимого (`digest`), поэтому одинаковые загрузки не дублируются,
+    а файлы можно кэшировать как неизменяемые. Возвращает URL основной версии в запасном формате.
+    """
+    digest = digest[:32]
+    try:
+        with Image.open(source) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise ValueError("Invalid image file.")
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    fallback_ext = "png" if has_alpha else "jpg"
+
+    for name, max_side in RENDITIONS.items():
+        rendition = image.copy()
+        rendition.thumbnail((max_side, max_side), Image.LANCZOS)
+        _save_atomically(rendition, f"{digest}-{name}.webp", "WEBP", quality=WEBP_QUALITY, method=4)
+        if has_alpha:
+            _save_atomically(rendition, f"{digest}-{name}.png", "PNG", optimize=True)
+        else:
+            _save_atomically(rendition, f"{digest}-{name}.jpg", "JPEG", quality=JPEG_QUALITY, optimize=True,
+                             progressive=True)
+    return f"{ICONS_URL_PREFIX}{digest}-{MAIN_RENDITION}.{fallback_ext}"
+
+
+def icon_renditions(icon_path: str | None) -> dict[str, dict[str, str]] | None:
+    """
+    Возвращает URL всех версий иконки, сохранённой через render_icon: {"thumb": {"webp": ..., "fallback": ...}, ...}.
+    Для старых иконок и иконок по умолчанию возвращает None.
+    """
+    digest = icon_digest(icon_path)
+    if not digest:
+        return None
+    fallback_ext = icon_path.rsplit(".", 1)[1]
+    return {
+        name: {
+            "webp": f"{ICONS_URL_PREFIX}{digest}-{name}.webp",
+            "fallback": f"{ICONS_URL_PREFIX}{digest}-{name}.{fallback_ext}",
+        }
+        for name in RENDITIONS
+    }
+
+
+def icon_digest(icon_path: str | None) -> str | None:
+    """
+    Возвращает хэш содержимого иконки, сохранённой через render_icon, или None для остальных путей.
+    """
+    if not icon_path or not icon_path.startswith(ICONS_URL_PREFIX):
+        return None
+    match = _ICON_NAME_RE.match(icon_path[len(ICONS_URL_PREFIX):])
+    return match.group(1) if match else None
+
+
+def file_digest(filename: str) -> str | None:
+    """
+    Возвращает хэш содержимого, к которому относится файл версии в UPLOAD_DIR, или None.
+    """
+    match = _RENDITION_NAME_RE.match(filename)
+    return match.group(1) if match else None
+
+
+def _save_atomically(image: Image.Image, filename: str, image_format: str, **params):
+    path = os.path.join(settings.UPLOAD_DIR, filename)
+    try:
+        # Файл уже есть: обновляем время изменения, чтобы сборщик мусора не удалил его до записи ссылки
+        os.utime(path)
+        return
+    except FileNotFoundError:
+        pass
+    fd, tmp_path = tempfile.mkstemp(dir=settings.UPLOAD_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            image.save(tmp, image_format, **params)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
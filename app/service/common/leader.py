@@ -0,0 +1,70 @@
+import threading
+from sqlalchemy import Connection, func, select
+from app.dao.db_config import engine
+
+# Ключ advisory-блокировки Postgres, которой владеет процесс-лидер планировщика
+SCHEDULER_LEADER_LOCK_KEY = 5_271_904_319
+
+
+class LeaderLease:
+    """
+    Аренда лидерства на сессионной advisory-блокировке Postgres.
+    Блокировка держится на отдельном соединении: если процесс-лидер падает, соединение закрывается,
+    Postgres снимает блокировку, и при следующем heartbeat её забирает другой процесс.
+    """
+
+    def __init__(self, lock_key: int):
+        self.lock_key = lock_key
+        self._connection: Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._connection is not None
+
+    def heartbeat(self) -> bool:
+        """
+        Лидер проверяет, что его соединение живо, остальные пытаются захватить блокировку.
+        Возвращает, является ли процесс лидером.
+        """
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.execute(select(1))
+                except Exception:
+                    # Соединение потеряно — вместе с ним и блокировка
+                    self._drop_connection()
+                return self._connection is not None
+            connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                acquired = connection.execute(select(func.pg_try_advisory_lock(self.lock_key))).scalar()
+            except Exception:
+                connection.close()
+                raise
+            if acquired:
+                self._connection = connection
+            else:
+                connection.close()
+            return acquired
+
+    def release(self):
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(select(func.pg_advisory_unlock(self.lock_key)))
+                self._connection.close()
+            except Exception:
+                self._drop_connection()
+            self._connection = None
+
+    def _drop_connection(self):
+        try:
+            self._connection.invalidate()
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+
+scheduler_lease = LeaderLease(SCHEDULER_LEADER_LOCK_KEY)
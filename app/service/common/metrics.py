@@ -0,0 +1,75 @@
+import threading
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class Metrics:
+    """
+    Простые метрики процесса: счётчики и сводки по длительностям (count, total, max).
+    """
+
+    def __init__(self):
+        self._counters: dict[str, int] = {}
+        self._timings: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            timing = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timings": {
+                    name: {**timing, "avg": timing["total"] / timing["count"]}
+                    for name, timing in self._timings.items()
+                },
+            }
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+
+    @property
+    def total(self) -> int:
+        return self.statements + self.commits
+
+
+@contextmanager
+def count_round_trips(db: Session):
+    """
+    Считает запросы и commit, выполненные через движок сессии `db` в текущем потоке внутри блока.
+    """
+    counter = RoundTripCounter()
+    engine = db.get_bind()
+    thread_id = threading.get_ident()
+
+    def on_execute(*args):
+        if threading.get_ident() == thread_id:
+            counter.statements += 1
+
+    def on_commit(*args):
+        if threading.get_ident() == thread_id:
+            counter.commits += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
+
+
+metrics = Metrics()
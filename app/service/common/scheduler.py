@@ -1,27 +1,104 @@
+from datetime import datetime
+from functools import wraps
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from app.config.config import settings
 from app.dao.db_config import SessionLocal
-from app.service.common.data_sync_manager import DataSyncManager
+from app.service.common.icon_store import collect_icon_garbage
+from app.service.common.leader import scheduler_lease
+from app.service.common.view_counter import view_counter
+from app.service.sync_job_service import SyncJobService, SyncAlreadyRunning
 
 
 def create_scheduler() -> BackgroundScheduler:
+    """
+    Планировщик запускается в каждом процессе. Задачи уровня кластера (синхронизация с БРС, сборка мусора иконок)
+    выполняет только лидер — процесс, удерживающий scheduler_lease. Сброс просмотров работает с буфером
+    своего процесса и выполняется везде.
+    """
     scheduler = BackgroundScheduler()
+    _add_leader_heartbeat_job(scheduler)
     _add_sync_job(scheduler)
+    _add_views_flush_job(scheduler)
+    _add_icon_gc_job(scheduler)
     return scheduler
 
 
+def flush_article_views():
+    db = SessionLocal()
+    try:
+        view_counter.flush(db)
+    finally:
+        db.close()
+
+
+def _leader_only(job):
+    @wraps(job)
+    def wrapper():
+        if scheduler_lease.is_leader:
+            job()
+
+    return wrapper
+
+
+def _add_leader_heartbeat_job(scheduler: BackgroundScheduler):
+    scheduler.add_job(
+        scheduler_lease.heartbeat,
+        trigger="interval",
+        seconds=settings.SCHEDULER_LEADER_HEARTBEAT_SECONDS,
+        next_run_time=datetime.now(),
+        max_instances=1,
+        coalesce=True,
+        id="leader_heartbeat"
+    )
+
+
 def _add_sync_job(scheduler: BackgroundScheduler):
+    @_leader_only
     def job():
         db = SessionLocal()
         try:
-            DataSyncManager(db).sync_all()
+            SyncJobService(db).start_job(wait=True)
+        except SyncAlreadyRunning:
+            pass
         finally:
             db.close()
 
     scheduler.add_job(
         job,
-        trigger="cron",
-        day_of_week="sun",
-        hour=0,
-        minute=0,
+        trigger=CronTrigger.from_crontab(settings.SYNC_SCHEDULE_CRON),
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=settings.SYNC_MISFIRE_GRACE_SECONDS,
         id="weekly_sync"
     )
+
+
+def _add_views_flush_job(scheduler: BackgroundScheduler):
+    scheduler.add_job(
+        flush_article_views,
+        trigger="interval",
+        seconds=settings.VIEWS_FLUSH_INTERVAL_SECONDS,
+        max_instances=1,
+        coalesce=True,
+        id="views_flush"
+    )
+
+
+def _add_icon_gc_job(scheduler: BackgroundScheduler):
+    @_leader_only
+    def job():
+        db = SessionLocal()
+        try:
+            collect_icon_garbage(db, settings.ICON_GC_BATCH_SIZE, settings.ICON_GC_GRACE_SECONDS)
+        finally:
+            db.close()
+
+    scheduler.add_job(
+        job,
+        trigger="interval",
+        seconds=settings.ICON_GC_INTERVAL_SECONDS,
+        max_instances=1,
+        coalesce=True,
+        id="icon_gc"
+    )
@@ -0,0 +1,144 @@
+import threading
+import time
+from datetime import date
+from app.config.config import settings
+from app.dao.entities.article_dao import ArticleDAO, event_date_matches
+
+
+class _TagIndexState:
+    def __init__(
+            self,
+            tag_ids_by_name: dict[str, frozenset[int]],
+            articles_by_tag_id: dict[int, tuple[tuple[int, ...], frozenset[int]]],
+            event_dates: dict[int, date],
+    ):
+        self.tag_ids_by_name = tag_ids_by_name
+        self.articles_by_tag_id = articles_by_tag_id
+        self.event_dates = event_dates
+        self.built_at = time.monotonic()
+
+
+class TagIndex:
+    """
+    Инвертированный индекс «тег -> статьи» в памяти процесса.
+    Для каждого тега хранит id статей, упорядоченные как в ленте (event_date desc, id desc),
+    поэтому пересечение по нескольким тегам сразу даёт нужный порядок и БД получает только id страницы.
+    Сбрасывается явно при записи статей и тегов, а также по TTL (изменения из других воркеров).
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._state: _TagIndexState | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._state = None
+
+    def find_articles(
+            self,
+            dao: ArticleDAO,
+            tag_names: list[str],
+            date_ranges: list[tuple[date | None, date | None]],
+            months: tuple[int | None, int | None] | None,
+            offset: int,
+            limit: int,
+            after: tuple[date, int] | None = None
+    ) -> list[int]:
+        """
+        Возвращает id статей, у которых есть все теги из `tag_names` и дата подходит под фильтр,
+        в порядке ленты. Страница задаётся либо `offset`, либо ключом `after` (event_date, id).
+        """
+        state = self._get_state(dao)
+        tag_sets = self._match_tags(state, tag_names)
+        if tag_sets is None:
+            return []
+        ordered, _ = tag_sets[0]
+        others = [ids for _, ids in tag_sets[1:]]
+
+        result = []
+        for article_id in ordered:
+            event_date = state.event_dates[article_id]
+            if after is not None and (event_date, article_id) >= after:
+                continue
+            if any(article_id not in ids for ids in others):
+                continue
+            if not event_date_matches(event_date, date_ranges, months):
+                continue
+            if after is None and offset > 0:
+                offset -= 1
+                continue
+            result.append(article_id)
+            if len(result) == limit:
+                break
+        return result
+
+    def article_ids(self, dao: ArticleDAO, tag_names: list[str]) -> frozenset[int]:
+        """
+        Возвращает id всех статей, у которых есть все теги из `tag_names`.
+        """
+        tag_sets = self._match_tags(self._get_state(dao), tag_names)
+        if tag_sets is None:
+            return frozenset()
+        return tag_sets[0][1].intersection(*(ids for _, ids in tag_sets[1:]))
+
+    def _match_tags(self, state: _TagIndexState, tag_names: list[str]):
+        """
+        Возвращает статьи по каждому тегу, начиная с самого редкого, или None, если какого-то тега нет.
+        """
+        tag_sets = []
+        for name in set(tag_names):
+            tag_ids = state.tag_ids_by_name.get(name)
+            if not tag_ids:
+                return None
+            tag_sets.append(self._articles_for_tags(state, tag_ids))
+        tag_sets.sort(key=lambda entry: len(entry[1]))
+        return tag_sets
+
+    @staticmethod
+    def _articles_for_tags(state: _TagIndexState, tag_ids: frozenset[int]):
+        entries = [state.articles_by_tag_id.get(tag_id, ((), frozenset())) for tag_id in tag_ids]
+        if len(entries) == 1:
+            return entries[0]
+        # Несколько тегов с одинаковым именем — объединяем их статьи
+        ids = frozenset().union(*(entry[1] for entry in entries))
+        return _order_by_feed(ids, state.event_dates), ids
+
+    def _get_state(self, dao: ArticleDAO) -> _TagIndexState:
+        with self._lock:
+            state = self._state
+            if state is not None and time.monotonic() - state.built_at < self.ttl_seconds:
+                return state
+            generation = self._generation
+            state = self._build(dao)
+            if generation == self._generation:
+                self._state = state
+            return state
+
+    @staticmethod
+    def _build(dao: ArticleDAO) -> _TagIndexState:
+        event_dates = dict(dao.get_article_event_dates())
+        tag_ids_by_name: dict[str, set[int]] = {}
+        for tag_id, name in dao.get_tag_names():
+            tag_ids_by_name.setdefault(name, set()).add(tag_id)
+        article_sets: dict[int, set[int]] = {}
+        for article_id, tag_id in dao.get_article_tag_links():
+            if article_id in event_dates and tag_id is not None:
+                article_sets.setdefault(tag_id, set()).add(article_id)
+        return _TagIndexState(
+            tag_ids_by_name={name: frozenset(ids) for name, ids in tag_ids_by_name.items()},
+            articles_by_tag_id={
+                tag_id: (_order_by_feed(ids, event_dates), frozenset(ids))
+                for tag_id, ids in article_sets.items()
+            },
+            event_dates=event_dates,
+        )
+
+
+def _order_by_feed(article_ids, event_dates: dict[int, date]) -> tuple[int, ...]:
+    return tuple(sorted(article_ids, key=lambda article_id: (event_dates[article_id], article_id), reverse=True))
+
+
+tag_index = TagIndex(settings.TAG_INDEX_TTL_SECONDS)
@@ -1,93 +1,399 @@
-import os
-import shutil
-from datetime import datetime, timedelta
-from typing import Callable
-import httpx
+import asyncio
+import base64
+import codecs
+import hashlib
+import json
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, NamedTuple
+from urllib.parse import urlsplit
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
 from app.config.config import settings
+from app.service.common.brs_client import brs_client
+from app.service.common.images import image_pool, render_icon
+from app.service.common.metrics import metrics
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+JSON_READ_CHUNK_SIZE = 64 * 1024
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*")
 
-def generate_url(url_template: str, year: int, session_num: int) -> str:
-    return url_template.format(year=year, session_num=session_num)
 
+class ProbeResult(NamedTuple):
+    items: list[dict]
+    # Самая свежая пара (год, сессия), для которой нашлись данные
+    found: tuple[int, int] | None
 
-def collect_data_until_found(url_template: str, extract_fn: Callable[[dict], list[dict]]) -> list[dict]:
-    current_year = datetime.now().year
 
-    while True:
-        # Пробуем текущий год, сессия 2
-        data_2 = _try_fetch(url_template, current_year, 2, extract_fn)
-        if data_2:
-            # если есть данные — пробуем 1-ю сессию этого же года
-            data_1 = _try_fetch(url_template, current_year, 1, extract_fn)
-            return data_2 + (data_1 or [])
-
-        # Пробуем текущий год, сессия 1
-        data_1 = _try_fetch(url_template, current_year, 1, extract_fn)
-        if data_1:
-            # если есть 1 — пробуем предыдущий год, сессия 2
-            data_prev_2 = _try_fetch(url_template, current_year - 1, 2, extract_fn)
-            return data_1 + (data_prev_2 or [])
-        current_year -= 1
+class SpooledPage:
+    """
+    Ответ БРС, сохранённый во временный файл. Элементы массива `key` разбираются при обходе по одному,
+    поэтому в памяти одновременно находится только один из них.
+    """
 
+    def __init__(self, file: BinaryIO, key: str):
+        self.file = file
+        self.key = key
+        self.has_items = any(True for _ in islice(self, 1))
 
-def _try_fetch(url_template: str, year: int, session_num: int, extract_fn: Callable[[dict], list[dict]]) -> list[dict]:
-    url = url_template.format(year=year, session_num=session_num)
-    response = httpx.get(url)
-    if response.status_code != 200:
-        return []
-    return extract_fn(response.json()) or []
+    def __bool__(self) -> bool:
+        return self.has_items
+
+    def __iter__(self) -> Iterator[dict]:
+        self.file.seek(0)
+        return iter_json_array(self.file, self.key)
+
+    def close(self):
+        self.file.close()
+
+
+class SpooledProbeResult(NamedTuple):
+    pages: list[SpooledPage]
+    # Самая свежая пара (год, сессия), для которой нашлись данные
+    found: tuple[int, int] | None
+
+    def iter_items(self) -> Iterator[dict]:
+        for page in self.pages:
+            yield from page
+
+    def close(self):
+        for page in self.pages:
+            page.close()
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def generate_url(url_template: str, year: int, session_num: int) -> str:
+    return url_template.format(year=year, session_num=session_num)
+
+
+def collect_data_until_found(
+        url_template: str,
+        extract_fn: Callable[[dict], list[dict]],
+        last_found: tuple[int, int] | None = None,
+) -> ProbeResult:
+    """
+    Ищет самую свежую пару (год, сессия) с данными в порядке (Y, 2), (Y, 1), (Y-1, 2), ... от текущего года
+    и возвращает её данные вместе с данными следующей по порядку пары.
+
+    Пары запрашиваются параллельно пакетами. Если известна последняя удачная пара `last_found`,
+    первый пакет — все пары от текущей до следующей за ней, поэтому обычная синхронизация делает
+    только необходимые запросы. Поиск не опускается ниже BRS_PROBE_FLOOR_YEAR и делает не больше
+    BRS_PROBE_BUDGET запросов, иначе выбрасывает RuntimeError. Следующая за найденной пара
+    запрашивается и сверх бюджета.
+    """
+    pages, found = _probe_until_found(
+        url_template,
+        lambda year, session_num: _try_fetch(url_template, year, session_num, extract_fn),
+        last_found,
+    )
+    return ProbeResult(items=[item for page in pages for item in page], found=found)
 
 
 def fetch_data_until_found(url_template: str, extract_fn, save_fn):
     """
-    Универсальная функция для попыток получить данные с подстановкой года и сессии.
+    Находит данные так же, как collect_data_until_found, и передаёт их в `save_fn`.
     `extract_fn` — функция, извлекающая данные из ответа.
     `save_fn` — функция, сохраняющая извлеченные данные.
     """
-    current_year = datetime.now().year
+    save_fn(collect_data_until_found(url_template, extract_fn).items)
+
+
+def spool_data_until_found(
+        url_template: str,
+        key: str,
+        last_found: tuple[int, int] | None = None,
+) -> SpooledProbeResult:
+    """
+    Ищет данные так же, как collect_data_until_found, но не разбирает ответы в память, а сохраняет их
+    во временные файлы. Элементы массива `key` читаются из результата по одному (iter_items),
+    после обработки результат нужно закрыть (close).
+    """
+    pages, found = _probe_until_found(
+        url_template,
+        lambda year, session_num: _try_spool(url_template, year, session_num, key),
+        last_found,
+    )
+    return SpooledProbeResult(pages=pages, found=found)
+
 
+def iter_json_array(file: BinaryIO, key: str) -> Iterator[Any]:
+    """
+    Разбирает JSON-объект из `file` по частям и по одному возвращает элементы массива по ключу `key`.
+    Остальные значения верхнего уровня пропускаются. Если ключа нет или по нему лежит не массив, ничего не возвращает.
+    """
+    reader = _JsonStreamReader(file)
+    reader.expect("{")
+    if reader.consume("}"):
+        return
     while True:
-        found_2 = try_fetch_and_save(url_template, current_year, 2, extract_fn, save_fn)
-        if found_2:
-            try_fetch_and_save(url_template, current_year, 1, extract_fn, save_fn)
-            return
-        found_1 = try_fetch_and_save(url_template, current_year, 1, extract_fn, save_fn)
-        if found_1:
-            try_fetch_and_save(url_template, current_year - 1, 2, extract_fn, save_fn)
+        name = reader.decode()
+        reader.expect(":")
+        if name == key and reader.consume("["):
+            if not reader.consume("]"):
+                while True:
+                    yield reader.decode()
+                    if reader.consume("]"):
+                        break
+                    reader.expect(",")
+        else:
+            reader.decode()
+        if reader.consume("}"):
             return
-        current_year -= 1
+        reader.expect(",")
 
 
-def try_fetch_and_save(url_template, year, session_num, extract_fn, save_fn) -> bool:
-    url = generate_url(url_template, year, session_num)
-    try:
-        response = httpx.get(url)
-        data = response.json()
-        extracted = extract_fn(data)
-        if extracted:
-            save_fn(extracted)
+class _JsonStreamReader:
+    """
+    Читает JSON из бинарного файла частями по JSON_READ_CHUNK_SIZE и разбирает значения по одному.
+    В буфере хранится только ещё не разобранный текст.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ""
+
+    def consume(self, char: str) -> bool:
+        if self.peek() == char:
+            self.pos += 1
             return True
         return False
-    except httpx.RequestError as e:
-        raise Exception(f"Error fetching data: {e}")
+
+    def expect(self, char: str):
+        if not self.consume(char):
+            raise ValueError(f"Invalid JSON: expected {char!r}, got {self.peek()!r}")
+
+    def decode(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+                continue
+            # Число в конце буфера может продолжаться в следующей части файла
+            if _JSON_NUMBER_TAIL.match(self.buffer, end).end() == len(self.buffer) and self._read_more():
+                continue
+            self.pos = end
+            return value
+
+    def _read_more(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(JSON_READ_CHUNK_SIZE)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
 
 
-def save_icon_file(icon: UploadFile, prefix: str) -> str:
+def _probe_until_found(
+        url_template: str,
+        fetch_fn: Callable[[int, int], Any],
+        last_found: tuple[int, int] | None,
+) -> tuple[list, tuple[int, int] | None]:
     """
-    Проверяет тип файла и сохраняет иконку.
-    Возвращает путь вида "/static/icons/filename.png"
+    Поиск пар для collect_data_until_found и spool_data_until_found. `fetch_fn(year, session_num)` возвращает
+    страницу данных, пустая страница ложна. Возвращает непустые страницы найденной и следующей пар и найденную пару.
+    """
+    candidates = [
+        (year, session_num)
+        for year in range(datetime.now().year, settings.BRS_PROBE_FLOOR_YEAR - 1, -1)
+        for session_num in (2, 1)
+    ]
+    batch_size = candidates.index(last_found) + 2 if last_found in candidates else settings.BRS_PROBE_BATCH_SIZE
+    fetched = []
+    while True:
+        found_index = next((i for i, data in enumerate(fetched) if data), None)
+        if found_index is not None:
+            if found_index + 1 < len(fetched) or found_index + 1 == len(candidates):
+                _close_pages(fetched[found_index + 2:])
+                return [page for page in fetched[found_index:found_index + 2] if page], candidates[found_index]
+            # Свежая пара уже найдена — нужна только следующая за ней, даже если бюджет поиска исчерпан
+            fetched.extend(_fetch_batch([candidates[found_index + 1]], fetch_fn))
+            continue
+        remaining = settings.BRS_PROBE_BUDGET - len(fetched)
+        if remaining <= 0 or len(fetched) == len(candidates):
+            raise RuntimeError(
+                f"No data found for {url_template} after {len(fetched)} requests "
+                f"(floor year {settings.BRS_PROBE_FLOOR_YEAR})"
+            )
+        size = min(batch_size, remaining)
+        fetched.extend(_fetch_batch(candidates[len(fetched):len(fetched) + size], fetch_fn))
+        batch_size = settings.BRS_PROBE_BATCH_SIZE
+
+
+def _fetch_batch(pairs: list[tuple[int, int]], fetch_fn: Callable[[int, int], Any]) -> list:
+    if len(pairs) == 1:
+        return [fetch_fn(*pairs[0])]
+    with ThreadPoolExecutor(max_workers=len(pairs), thread_name_prefix="brs-probe") as pool:
+        futures = [pool.submit(copy_context().run, fetch_fn, year, session_num) for year, session_num in pairs]
+        return [future.result() for future in futures]
+
+
+def _close_pages(pages: list):
+    for page in pages:
+        if isinstance(page, SpooledPage):
+            page.close()
+
+
+def _try_fetch(url_template: str, year: int, session_num: int, extract_fn: Callable[[dict], list[dict]]) -> list[dict]:
+    response = brs_client.get(generate_url(url_template, year, session_num), endpoint=urlsplit(url_template).path)
+    if response.status_code >= 500:
+        # Сбой БРС нельзя принимать за отсутствие данных, иначе поиск уйдёт к прошлым годам
+        raise RuntimeError(f"BRS returned {response.status_code} for {year}/{session_num}")
+    if response.status_code != 200:
+        return []
+    return extract_fn(response.json()) or []
+
+
+def _try_spool(url_template: str, year: int, session_num: int, key: str) -> SpooledPage | None:
+    file = tempfile.TemporaryFile()
+    try:
+        status_code = brs_client.download(
+            generate_url(url_template, year, session_num), file, endpoint=urlsplit(url_template).path
+        )
+        if status_code >= 500:
+            raise RuntimeError(f"BRS returned {status_code} for {year}/{session_num}")
+        page = SpooledPage(file, key) if status_code == 200 else None
+    except Exception:
+        file.close()
+        raise
+    if not page:
+        file.close()
+        return None
+    return page
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+async def save_icon_file(icon: UploadFile) -> str:
+    """
+    Проверяет тип файла и сохраняет версии иконки (см. render_icon).
+    Starlette уже сохранил тело запроса во временный файл, поэтому иконка обрабатывается прямо из него:
+    подсчёт хэша с проверкой размера и обработка изображения выполняются вне цикла событий.
+    Возвращает путь вида "/static/icons/<hash>-full.jpg"
     """
     if not icon.content_type.startswith("image/"):
         raise ValueError("Invalid file type. Expected an image.")
-    filename = f"{prefix.replace(' ', '_')}_{icon.filename}"
-    icon_path = os.path.join(settings.UPLOAD_DIR, filename)
-    with open(icon_path, "wb") as buffer:
-        shutil.copyfileobj(icon.file, buffer)
-    return f"/static/icons/{filename}"
+    started = time.perf_counter()
+    digest, size = await run_in_threadpool(_hash_upload, icon.file)
+    metrics.observe("icon_upload.receive", time.perf_counter() - started)
+
+    processing_started = time.perf_counter()
+    icon_path = await asyncio.wrap_future(image_pool.submit(render_icon, icon.file, digest))
+    metrics.observe("icon_upload.process", time.perf_counter() - processing_started)
+    metrics.increment("icon_upload.count")
+    metrics.increment("icon_upload.bytes", size)
+    metrics.observe("icon_upload.total", time.perf_counter() - started)
+    return icon_path
+
+
+def _hash_upload(file: BinaryIO) -> tuple[str, int]:
+    """
+    Считает sha256 и размер загруженного файла, не превышая MAX_UPLOAD_SIZE_BYTES,
+    и возвращает файл в начало для последующего чтения.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    while chunk := file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > settings.MAX_UPLOAD_SIZE_BYTES:
+            metrics.increment("icon_upload.rejected")
+            raise UploadTooLargeError(
+                f"File is too large. Maximum size is {settings.MAX_UPLOAD_SIZE_BYTES} bytes."
+            )
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest(), size
+
+
+def make_excerpt(text: str | None, length: int) -> str | None:
+    """
+    Обрезает текст до `length` символов по границе слова и добавляет многоточие.
+    """
+    if not text:
+        return None
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    if " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    return cut.rstrip(" ,.;:-") + "…"
+
+
+def encode_cursor(event_date: date, article_id: int) -> str:
+    """
+    Упаковывает ключ (event_date, id) в непрозрачный курсор для пагинации.
+    """
+    return _encode_cursor_key([event_date.isoformat(), article_id])
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """
+    Распаковывает курсор, полученный от encode_cursor.
+    """
+    try:
+        event_date, article_id = _decode_cursor_key(cursor)
+        return date.fromisoformat(event_date), int(article_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def encode_search_cursor(rank: float, article_id: int) -> str:
+    """
+    Упаковывает ключ (rank, id) результата поиска в непрозрачный курсор.
+    """
+    return _encode_cursor_key([rank, article_id])
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Распаковывает курсор, полученный от encode_search_cursor.
+    """
+    try:
+        rank, article_id = _decode_cursor_key(cursor)
+        return float(rank), int(article_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _encode_cursor_key(key: list) -> str:
+    raw = json.dumps(key).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor_key(cursor: str) -> list:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
 
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(hours=12)) -> str:
@@ -0,0 +1,40 @@
+import threading
+from sqlalchemy.orm import Session
+from app.dao.entities.article_dao import ArticleDAO
+
+
+class ViewCounter:
+    """
+    Буфер просмотров статей в памяти процесса.
+    Просмотры копятся здесь и периодически записываются в БД одним UPDATE на все статьи,
+    чтобы каждый просмотр не блокировал строку статьи.
+    """
+
+    def __init__(self):
+        self._counts: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, article_id: int):
+        with self._lock:
+            self._counts[article_id] = self._counts.get(article_id, 0) + 1
+
+    def flush(self, db: Session) -> int:
+        """
+        Записывает накопленные просмотры в БД. Возвращает число обновлённых статей.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return 0
+        try:
+            ArticleDAO(db).increment_views(counts)
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for article_id, count in counts.items():
+                    self._counts[article_id] = self._counts.get(article_id, 0) + count
+            raise
+        return len(counts)
+
+
+view_counter = ViewCounter()
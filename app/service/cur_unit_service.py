@@ -1,6 +1,10 @@
+from app.config.config import settings
 from app.dao.entities.cur_unit_dao import CurriculumUnitDAO
 from app.dao.models import CurriculumUnit
-from app.service.common.utils import fetch_data_until_found, collect_data_until_found
+from app.service.common.brs_records import record_fingerprint
+from app.service.common.metrics import count_round_trips
+from app.service.common.utils import fetch_data_until_found, collect_data_until_found, ProbeResult, chunked, \
+    spool_data_until_found, SpooledProbeResult
 
 
 class CurriculumUnitService:
@@ -14,41 +18,64 @@ class CurriculumUnitService:
         return self.dao.get_cur_unit_by_brs_id(brs_id)
 
     @staticmethod
-    def fetch_units(url_template: str) -> list[dict]:
-        return collect_data_until_found(url_template, lambda d: d.get("curriculum_units", []))
+    def fetch_units(url_template: str, last_found: tuple[int, int] | None = None) -> ProbeResult:
+        return collect_data_until_found(url_template, lambda d: d.get("curriculum_units", []), last_found)
 
-    def create_curriculum_units(self, url_template, commit: bool = True):
+    @staticmethod
+    def spool_units(url_template: str, last_found: tuple[int, int] | None = None) -> SpooledProbeResult:
+        return spool_data_until_found(url_template, "curriculum_units", last_found)
+
+    def create_curriculum_units(self, url_template, commit: bool = True) -> dict[str, int]:
+        stats = {}
         fetch_data_until_found(
             url_template,
             extract_fn=lambda data: data.get("curriculum_units", []),
-            save_fn=lambda units: self._save_curriculum_unit(units, commit=commit)
+            save_fn=lambda units: stats.update(self._save_curriculum_unit(units, commit=commit))
         )
+        return stats
 
-    def _save_curriculum_unit(self, units: list, commit: bool = True):
-        for unit in units:
-            brs_id = unit.get("id")
-            existing = self.dao.get_cur_unit_by_brs_id(brs_id)
-            if existing:
-                self._update_existing_unit(existing, unit, commit)
-            else:
-                self._add_new_unit(brs_id, unit, commit)
+    def _save_curriculum_unit(self, units: list, commit: bool = True) -> dict[str, int]:
+        """
+        Сохраняет учебные единицы пачками по SYNC_CHUNK_SIZE: существующие строки пачки загружаются одним запросом,
+        каждая пачка записывается отдельным commit. Возвращает число записей и обращений к БД.
+        """
+        with count_round_trips(self.dao.db) as round_trips:
+            for chunk in chunked(units, settings.SYNC_CHUNK_SIZE):
+                existing_units = self.dao.get_by_keys([unit.get("id") for unit in chunk])
+                for unit in chunk:
+                    brs_id = unit.get("id")
+                    existing = existing_units.get(brs_id)
+                    if existing:
+                        self._update_existing_unit(existing, unit, commit=False)
+                    else:
+                        existing_units[brs_id] = self._add_new_unit(brs_id, unit, commit=False)
+                self.dao.save_changes(commit)
+        return {"processed": len(units), "round_trips": round_trips.total}
 
     def _update_existing_unit(self, existing_unit: CurriculumUnit, data: dict, commit: bool = True):
+        fingerprint = record_fingerprint(CurriculumUnit, data)
+        if existing_unit.brs_fingerprint == fingerprint:
+            return
+        existing_unit.mark_type = data.get("mark_type")
         existing_unit.practice_teacher_brs_ids = data.get("practice_teacher_ids", [])
         existing_unit.stud_group_brs_id = data["stud_group_id"]
         existing_unit.subject_brs_id = data["subject_id"]
         existing_unit.teacher_brs_id = data["teacher_id"]
+        existing_unit.brs_fingerprint = fingerprint
         self.dao.update_curriculum_unit(existing_unit, commit)
 
-    def _add_new_unit(self, brs_id: int, data: dict, commit: bool = True):
+    def _add_new_unit(self, brs_id: int, data: dict, commit: bool = True) -> CurriculumUnit:
         unit = CurriculumUnit(
             brs_id=brs_id,
+            mark_type=data.get("mark_type"),
             practice_teacher_brs_ids=data.get("practice_teacher_ids", []),
             stud_group_brs_id=data["stud_group_id"],
             subject_brs_id=data["subject_id"],
-            teacher_brs_id=data["teacher_id"]
+            teacher_brs_id=data["teacher_id"],
+            brs_fingerprint=record_fingerprint(CurriculumUnit, data)
         )
         self.dao.create_curriculum_unit(unit, commit)
+        return unit
 
     def get_full_curriculum_unit_info_by_id(self, id_: int):
         return self.dao.get_cur_unit_full_info_by_id(id_)
@@ -1,6 +1,9 @@
+from app.config.config import settings
 from app.dao.entities.stud_group_dao import StudGroupDAO
 from app.dao.models import StudGroup
-from app.service.common.utils import fetch_data_until_found, collect_data_until_found
+from app.service.common.brs_records import record_fingerprint
+from app.service.common.metrics import count_round_trips
+from app.service.common.utils import fetch_data_until_found, collect_data_until_found, ProbeResult, chunked
 
 
 class StudGroupService:
@@ -11,36 +14,53 @@ class StudGroupService:
         return self.dao.get_all_stud_groups()
 
     @staticmethod
-    def fetch_groups(url_template: str) -> list[dict]:
-        return collect_data_until_found(url_template, lambda d: d.get("stud_groups", []))
+    def fetch_groups(url_template: str, last_found: tuple[int, int] | None = None) -> ProbeResult:
+        return collect_data_until_found(url_template, lambda d: d.get("stud_groups", []), last_found)
 
-    def create_stud_groups(self, url_template, commit: bool = True):
+    def create_stud_groups(self, url_template, commit: bool = True) -> dict[str, int]:
+        stats = {}
         fetch_data_until_found(
             url_template,
             extract_fn=lambda data: data.get("stud_groups", []),
-            save_fn=lambda groups: self._save_group(groups, commit=commit)
+            save_fn=lambda groups: stats.update(self._save_group(groups, commit=commit))
         )
+        return stats
 
-    def _save_group(self, group_data: list, commit: bool = True) -> None:
-        for group in group_data:
-            brs_id = group.get("id")
-            existing_group = self.dao.get_stud_group_by_brs_id(brs_id)
-            if existing_group:
-                self._update_existing_group(existing_group, group, commit)
-            else:
-                self._add_new_group(brs_id, group, commit)
+    def _save_group(self, group_data: list, commit: bool = True) -> dict[str, int]:
+        """
+        Сохраняет группы пачками по SYNC_CHUNK_SIZE: существующие строки пачки загружаются одним запросом,
+        каждая пачка записывается отдельным commit. Возвращает число записей и обращений к БД.
+        """
+        with count_round_trips(self.dao.db) as round_trips:
+            for chunk in chunked(group_data, settings.SYNC_CHUNK_SIZE):
+                existing = self.dao.get_by_keys([group.get("id") for group in chunk])
+                for group in chunk:
+                    brs_id = group.get("id")
+                    existing_group = existing.get(brs_id)
+                    if existing_group:
+                        self._update_existing_group(existing_group, group, commit=False)
+                    else:
+                        existing[brs_id] = self._add_new_group(brs_id, group, commit=False)
+                self.dao.save_changes(commit)
+        return {"processed": len(group_data), "round_trips": round_trips.total}
 
     def _update_existing_group(self, existing_group: StudGroup, group: dict, commit: bool = True):
+        fingerprint = record_fingerprint(StudGroup, group)
+        if existing_group.brs_fingerprint == fingerprint:
+            return
         existing_group.course = group.get("course")
         existing_group.semester = group.get("semester")
         existing_group.education_level = group.get("education_level")
+        existing_group.brs_fingerprint = fingerprint
         self.dao.update_group(existing_group, commit)
 
-    def _add_new_group(self, brs_id: int, group: dict, commit: bool = True):
+    def _add_new_group(self, brs_id: int, group: dict, commit: bool = True) -> StudGroup:
         new_group = StudGroup(
             brs_id=brs_id,
             course=group.get("course"),
             semester=group.get("semester"),
-            education_level=group.get("education_level")
+            education_level=group.get("education_level"),
+            brs_fingerprint=record_fingerprint(StudGroup, group)
         )
         self.dao.create_stud_group(new_group, commit)
+        return new_group
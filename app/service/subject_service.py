@@ -2,6 +2,11 @@ import httpx
 from sqlalchemy.orm import Session
 from app.dao.entities.subject_dao import SubjectDAO
 from app.dao.models import Subject
+from app.config.config import settings
+from app.service.common.brs_client import brs_client
+from app.service.common.brs_records import record_fingerprint
+from app.service.common.metrics import count_round_trips
+from app.service.common.utils import chunked
 
 
 class SubjectService:
@@ -14,44 +19,59 @@ class SubjectService:
     @staticmethod
     def fetch_subjects(url: str) -> list[dict]:
         try:
-            response = httpx.get(url)
+            response = brs_client.get(url)
             response.raise_for_status()
             data = response.json()
             return data.get("subjects", [])
         except Exception as e:
             raise RuntimeError(f"Error fetching subjects from API: {e}")
 
-    def create_subjects(self, url: str, commit: bool = True):
+    def create_subjects(self, url: str, commit: bool = True) -> dict[str, int]:
         try:
-            response = httpx.get(url)
+            response = brs_client.get(url)
             data = response.json()
             subjects = data.get("subjects", [])
             if subjects:
-                self._save_subjects(subjects, commit)
+                return self._save_subjects(subjects, commit)
             else:
                 raise ValueError("Subjects not found in the response")
         except httpx.RequestError as e:
             raise Exception(f"Error fetching data: {e}")
 
-    def _save_subjects(self, subjects_data: list, commit: bool = True) -> None:
-        for subject in subjects_data:
-            brs_id = subject.get("id")
-            existing_subject = self.dao.get_subject_by_brs_id(brs_id)
-            if existing_subject:
-                self._update_existing_subject(existing_subject, subject, commit)
-            else:
-                self._add_new_subject(brs_id, subject, commit)
+    def _save_subjects(self, subjects_data: list, commit: bool = True) -> dict[str, int]:
+        """
+        Сохраняет дисциплины пачками по SYNC_CHUNK_SIZE: существующие строки пачки загружаются одним запросом,
+        каждая пачка записывается отдельным commit. Возвращает число записей и обращений к БД.
+        """
+        with count_round_trips(self.dao.db) as round_trips:
+            for chunk in chunked(subjects_data, settings.SYNC_CHUNK_SIZE):
+                existing = self.dao.get_by_keys([subject.get("id") for subject in chunk])
+                for subject in chunk:
+                    brs_id = subject.get("id")
+                    existing_subject = existing.get(brs_id)
+                    if existing_subject:
+                        self._update_existing_subject(existing_subject, subject, commit=False)
+                    else:
+                        existing[brs_id] = self._add_new_subject(brs_id, subject, commit=False)
+                self.dao.save_changes(commit)
+        return {"processed": len(subjects_data), "round_trips": round_trips.total}
 
     def _update_existing_subject(self, existing_subject: Subject, subject: dict, commit: bool = True):
+        fingerprint = record_fingerprint(Subject, subject)
+        if existing_subject.brs_fingerprint == fingerprint:
+            return
         existing_subject.name = subject.get("name")
+        existing_subject.brs_fingerprint = fingerprint
         self.dao.update_subject(existing_subject, commit)
 
-    def _add_new_subject(self, brs_id: int, subject: dict, commit: bool = True):
+    def _add_new_subject(self, brs_id: int, subject: dict, commit: bool = True) -> Subject:
         new_subject = Subject(
             brs_id=brs_id,
-            name=subject.get("name")
+            name=subject.get("name"),
+            brs_fingerprint=record_fingerprint(Subject, subject)
         )
         self.dao.create_subject(new_subject, commit)
+        return new_subject
 
     def get_subjects_by_teacher_id(self, teacher_id: int) -> list[Subject]:
         return self.dao.get_subjects_by_teacher_id(teacher_id)
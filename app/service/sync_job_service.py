@@ -0,0 +1,205 @@
+import multiprocessing
+import threading
+import time
+from datetime import datetime
+import pytz
+from sqlalchemy import Connection, func, select
+from sqlalchemy.orm import Session
+from app.api.dto import SyncJobResponse
+from app.config.config import settings
+from app.dao.db_config import SessionLocal, engine
+from app.dao.entities.sync_job_dao import SyncJobDAO
+from app.dao.models import SyncJob
+from app.service.common.data_sync_manager import DataSyncManager
+
+# Ключ advisory-блокировки Postgres, под которой выполняется полная синхронизация во всём кластере
+SYNC_LOCK_KEY = 5_271_904_318
+
+# Режимы выполнения синхронизации: в потоке текущего процесса или в отдельном процессе-воркере
+SYNC_MODE_THREAD = "thread"
+SYNC_MODE_PROCESS = "process"
+
+
+class SyncAlreadyRunning(RuntimeError):
+    pass
+
+
+class SyncJobService:
+    def __init__(self, db: Session):
+        self.dao = SyncJobDAO(db)
+
+    def get_job(self, job_id: int) -> SyncJob | None:
+        return self.dao.get_job_by_id(job_id)
+
+    def start_job(self, wait: bool = False, mode: str | None = None) -> tuple[SyncJob, bool]:
+        """
+        Запускает полную синхронизацию, если её не выполняет ни один процесс (pg_try_advisory_lock).
+        Иначе возвращает уже идущую задачу.
+        В режиме "process" синхронизация идёт в отдельном процессе со своим engine и пулом соединений,
+        а фоновый поток лишь ждёт его завершения; в режиме "thread" — прямо в фоновом потоке.
+        По умолчанию режим берётся из settings.SYNC_EXECUTION_MODE.
+        Возвращает (задача, запущена ли новая). С `wait=True` ждёт завершения синхронизации.
+        """
+        mode = mode or settings.SYNC_EXECUTION_MODE
+        if mode not in (SYNC_MODE_THREAD, SYNC_MODE_PROCESS):
+            raise ValueError(f"Unknown sync execution mode: {mode}")
+        lock_connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = lock_connection.execute(select(func.pg_try_advisory_lock(SYNC_LOCK_KEY))).scalar()
+        except Exception:
+            lock_connection.close()
+            raise
+        if not acquired:
+            lock_connection.close()
+            job = self.dao.get_running_job()
+            if job is None:
+                raise SyncAlreadyRunning("Sync is already running")
+            return job, False
+
+        try:
+            self.dao.fail_interrupted_jobs()
+            job = self.dao.create_job()
+        except Exception:
+            _release_lock(lock_connection)
+            raise
+        target = _run_job_process if mode == SYNC_MODE_PROCESS else _run_job
+        thread = threading.Thread(
+            target=target, args=(job.id, lock_connection), name=f"sync-job-{job.id}", daemon=True
+        )
+        thread.start()
+        if wait:
+            thread.join()
+            self.dao.db.refresh(job)
+        return job, True
+
+    @staticmethod
+    def to_response_dto(job: SyncJob) -> SyncJobResponse:
+        return SyncJobResponse(
+            id=job.id,
+            status=job.status,
+            phase=job.phase,
+            stats=job.stats,
+            timings=job.timings or {},
+            error=job.error,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
+
+
+class _JobProgress:
+    """
+    Записывает в sync_jobs текущую фазу и длительность завершённых фаз.
+    """
+
+    def __init__(self, dao: SyncJobDAO, job: SyncJob):
+        self.dao = dao
+        self.job = job
+        self.timings: dict[str, float] = {}
+        self._phase: str | None = None
+        self._phase_started = time.monotonic()
+
+    def enter(self, phase: str):
+        self._close_phase()
+        self._phase = phase
+        self.dao.update_job(self.job, phase=phase, timings=dict(self.timings))
+
+    def finish(self, status: str, **fields):
+        self._close_phase()
+        self.dao.update_job(
+            self.job,
+            status=status,
+            phase="done",
+            timings=dict(self.timings),
+            finished_at=datetime.now(pytz.timezone('Europe/Moscow')),
+            **fields,
+        )
+
+    def _close_phase(self):
+        now = time.monotonic()
+        if self._phase is not None:
+            self.timings[self._phase] = round(now - self._phase_started, 3)
+        self._phase_started = now
+
+
+def _run_job(job_id: int, lock_connection: Connection):
+    try:
+        _execute_job(job_id)
+    finally:
+        _release_lock(lock_connection)
+
+
+def _run_job_process(job_id: int, lock_connection: Connection):
+    """
+    Запускает синхронизацию в дочернем процессе и ждёт его. Процесс создаётся через spawn:
+    он заново импортирует приложение и открывает собственные соединения, не наследуя пул родителя.
+    Фазы, статистику и ошибки процесс пишет в sync_jobs; если он умер, не успев этого сделать,
+    задача помечается упавшей здесь. Блокировка остаётся на соединении родителя до конца работы процесса.
+    """
+    try:
+        process = multiprocessing.get_context("spawn").Process(
+            target=_execute_job_in_worker, args=(job_id,), name=f"sync-worker-{job_id}", daemon=True
+        )
+        try:
+            process.start()
+            process.join()
+            exit_code = process.exitcode
+        except Exception as e:
+            exit_code = None
+            error = f"Sync worker failed: {e}"
+        else:
+            error = f"Sync worker exited with code {exit_code}"
+        if exit_code != 0:
+            _fail_job_if_running(job_id, error)
+    finally:
+        _release_lock(lock_connection)
+
+
+def _execute_job_in_worker(job_id: int):
+    try:
+        _execute_job(job_id)
+    finally:
+        engine.dispose()
+
+
+def _execute_job(job_id: int):
+    job_db = SessionLocal()
+    sync_db = SessionLocal()
+    try:
+        dao = SyncJobDAO(job_db)
+        progress = _JobProgress(dao, dao.get_job_by_id(job_id))
+        try:
+            stats = DataSyncManager(sync_db).sync_all(progress=progress.enter)
+        except Exception as e:
+            progress.finish("failed", error=str(e))
+        else:
+            progress.finish("succeeded", stats=stats)
+    finally:
+        sync_db.close()
+        job_db.close()
+
+
+def _fail_job_if_running(job_id: int, error: str):
+    db = SessionLocal()
+    try:
+        dao = SyncJobDAO(db)
+        job = dao.get_job_by_id(job_id)
+        if job is not None and job.status == "running":
+            dao.update_job(
+                job,
+                status="failed",
+                phase="done",
+                error=error,
+                finished_at=datetime.now(pytz.timezone('Europe/Moscow')),
+            )
+    finally:
+        db.close()
+
+
+def _release_lock(lock_connection: Connection):
+    try:
+        lock_connection.execute(select(func.pg_advisory_unlock(SYNC_LOCK_KEY)))
+    except Exception:
+        # Соединение с неснятой блокировкой нельзя возвращать в пул
+        lock_connection.invalidate()
+    finally:
+        lock_connection.close()
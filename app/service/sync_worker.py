@@ -0,0 +1,49 @@
+"""
+Запуск полной синхронизации с БРС вне веб-процесса — из cron или sidecar-контейнера:
+
+    python -m app.service.sync_worker
+
+Синхронизация идёт под той же advisory-блокировкой и пишет тот же журнал sync_jobs, что и запуск через API.
+Код выхода: 0 — синхронизация прошла успешно, 1 — упала, 2 — уже выполняется другим процессом.
+"""
+import argparse
+import sys
+from app.dao.db_config import SessionLocal, engine
+from app.service.common.brs_client import brs_client
+from app.service.sync_job_service import SyncAlreadyRunning, SyncJobService, SYNC_MODE_PROCESS, SYNC_MODE_THREAD
+
+EXIT_SUCCEEDED = 0
+EXIT_FAILED = 1
+EXIT_ALREADY_RUNNING = 2
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.service.sync_worker", description="Full BRS sync")
+    parser.add_argument(
+        "--mode",
+        choices=(SYNC_MODE_THREAD, SYNC_MODE_PROCESS),
+        default=SYNC_MODE_THREAD,
+        help="thread — синхронизировать в этом процессе, process — в дочернем процессе",
+    )
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        service = SyncJobService(db)
+        try:
+            job, started = service.start_job(wait=True, mode=args.mode)
+        except SyncAlreadyRunning:
+            print("Sync is already running", file=sys.stderr)
+            return EXIT_ALREADY_RUNNING
+        print(service.to_response_dto(job).model_dump_json())
+        if not started:
+            return EXIT_ALREADY_RUNNING
+        return EXIT_SUCCEEDED if job.status == "succeeded" else EXIT_FAILED
+    finally:
+        db.close()
+        brs_client.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
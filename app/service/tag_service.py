@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from app.api.dto import TagBase
 from app.dao.entities.tag_dao import TagDAO
 from app.dao.models import Tag
+from app.service.common.tag_index import tag_index
 
 
 class TagService:
@@ -16,4 +17,6 @@ class TagService:
         if existing_tag:
             return None
         new_tag = Tag(**tag.dict())
-        return self.dao.create_tag(new_tag)
+        created_tag = self.dao.create_tag(new_tag)
+        tag_index.invalidate()
+        return created_tag
@@ -1,9 +1,13 @@
-import httpx
 from sqlalchemy.orm import Session
 
 from app.api.dto import TeacherBase
+from app.config.config import settings
 from app.dao.entities.teacher_dao import TeacherDAO
 from app.dao.models import Teacher
+from app.service.common.brs_client import brs_client
+from app.service.common.brs_records import record_fingerprint
+from app.service.common.metrics import count_round_trips
+from app.service.common.utils import chunked
 
 
 class TeacherService:
@@ -29,7 +33,7 @@ class TeacherService:
         Загружает данные учителей из внешнего API.
         """
         try:
-            response = httpx.get(url)
+            response = brs_client.get(url)
             response.raise_for_status()
             data = response.json()
 
@@ -39,20 +43,30 @@ class TeacherService:
         except Exception as e:
             raise RuntimeError(f"Error fetching teachers from API: {e}")
 
-    def synchronize_teachers(self, teachers: list[dict], commit: bool = True):
+    def synchronize_teachers(self, teachers: list[dict], commit: bool = True) -> dict[str, int]:
         """
         Синхронизирует базу данных с данными из API.
+        Преподаватели обрабатываются пачками по SYNC_CHUNK_SIZE: существующие строки пачки загружаются
+        одним запросом по person_id. Возвращает число записей и обращений к БД.
         """
-        for teacher_data in teachers:
-            teacher_data["brs_id"] = teacher_data.pop("id", None)
-            existing_teacher = self.dao.get_teacher_by_person_id(teacher_data["person_id"])
-            if existing_teacher:
-                self.dao.update_teacher(existing_teacher, teacher_data)
-            else:
-                new_teacher = Teacher(**teacher_data)
-                self.dao.add_teacher(new_teacher)
-        if commit:
-            self.dao.save_changes()
+        with count_round_trips(self.dao.db) as round_trips:
+            for chunk in chunked(teachers, settings.SYNC_CHUNK_SIZE):
+                existing = self.dao.get_by_keys([teacher["person_id"] for teacher in chunk])
+                for teacher_data in chunk:
+                    fingerprint = record_fingerprint(Teacher, teacher_data)
+                    teacher_data["brs_id"] = teacher_data.pop("id", None)
+                    existing_teacher = existing.get(teacher_data["person_id"])
+                    if existing_teacher:
+                        if existing_teacher.brs_fingerprint == fingerprint:
+                            continue
+                        self.dao.update_teacher(existing_teacher, teacher_data)
+                        existing_teacher.brs_fingerprint = fingerprint
+                    else:
+                        new_teacher = Teacher(**teacher_data, brs_fingerprint=fingerprint)
+                        self.dao.add_teacher(new_teacher)
+                        existing[new_teacher.person_id] = new_teacher
+                self.dao.save_changes(commit)
+        return {"processed": len(teachers), "round_trips": round_trips.total}
 
     def get_teachers_by_subject_id(self, subject_brs_id: int):
         return self.dao.get_teachers_by_subject_id(subject_brs_id)
@@ -0,0 +1,104 @@
+import io
+import itertools
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.service.common.cache import latest_articles_cache, article_facets_cache
+from app.service.common.tag_index import tag_index
+from bench.common import analyze
+
+# Частые слова новостей кафедры; остальной словарь — сгенерированные слова из слогов
+COMMON_WORDS = (
+    "кафедра студент преподаватель университет конференция семинар лекция практика проект "
+    "исследование программирование информатика технология разработка система данные анализ "
+    "модель алгоритм сеть безопасность защита олимпиада победа команда конкурс выставка "
+    "магистратура бакалавриат аспирант диссертация доступ диплом сессия экзамен зачёт расписание "
+    "занятие курс лаборатория оборудование компьютер сервер облако интеллект обучение робот "
+    "партнёр компания стажировка вакансия выпускник абитуриент приём чемпионат хакатон грант "
+    "публикация журнал статья доклад секция форум встреча мастер-класс экскурсия фестиваль"
+).split()
+SYLLABLES = "ка ро ми ту ле за ви но ди ра пе со лу ге ба ны ще фо хи жа".split()
+TAG_NAMES = [
+    "Наука", "Учёба", "Конференции", "Олимпиады", "Абитуриентам", "Выпускники", "Партнёры",
+    "Стажировки", "Гранты", "Студенческая жизнь", "Спорт", "Проекты", "Лаборатории", "Магистратура",
+    "Аспирантура", "Международное сотрудничество", "Хакатоны", "Мероприятия", "Награды", "Объявления",
+]
+COPY_BATCH_SIZE = 5000
+
+
+def build_vocabulary(size: int, rng: random.Random) -> list[str]:
+    """
+    Словарь из `size` слов: сначала частые слова, затем уникальные сгенерированные.
+    Слова выбираются по закону Ципфа, поэтому порядок в словаре задаёт их частоту.
+    """
+    words = list(COMMON_WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 5)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def seed_articles(
+        db: Session,
+        count: int,
+        content_words: int,
+        vocabulary_size: int = 20000,
+        years: int = 10,
+        seed: int = 42,
+) -> list[str]:
+    """
+    Очищает статьи и теги и загружает `count` статей через COPY: заголовок из 4–10 слов,
+    текст из примерно `content_words` слов, даты за последние `years` лет, у каждой статьи до трёх тегов.
+    Возвращает словарь корпуса в порядке убывания частоты слов.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(vocabulary_size, rng)
+    cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    today = date.today()
+    created_at = datetime.now().isoformat()
+
+    db.execute(text("TRUNCATE article_tag_association, articles, tags RESTART IDENTITY CASCADE"))
+    cursor = db.connection().connection.cursor()
+    try:
+        _copy(cursor, "tags (name)", ([name] for name in TAG_NAMES))
+        for start in range(0, count, COPY_BATCH_SIZE):
+            batch = range(start, min(start + COPY_BATCH_SIZE, count))
+            _copy(cursor, "articles (title, icon, views, content, event_date, created_at)", (
+                [
+                    " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(4, 10))).capitalize(),
+                    None,
+                    rng.randint(0, 5000),
+                    " ".join(rng.choices(
+                        vocabulary, cum_weights=cum_weights, k=rng.randint(content_words // 2, content_words * 3 // 2)
+                    )),
+                    (today - timedelta(days=rng.randint(-30, years * 365))).isoformat(),
+                    created_at,
+                ]
+                for _ in batch
+            ))
+            _copy(cursor, "article_tag_association (article_id, tag_id)", (
+                [article_id + 1, tag_id]
+                for article_id in batch
+                for tag_id in rng.sample(range(1, len(TAG_NAMES) + 1), rng.randint(0, 3))
+            ))
+    finally:
+        cursor.close()
+    db.commit()
+    analyze(db, "articles", "tags", "article_tag_association")
+    tag_index.invalidate()
+    latest_articles_cache.invalidate()
+    article_facets_cache.invalidate()
+    return vocabulary
+
+
+def _copy(cursor, target: str, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(r"\N" if value is None else str(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {target} FROM STDIN", buffer)
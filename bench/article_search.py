@@ -0,0 +1,82 @@
+"""
+Бенчмарк полнотекстового поиска статей (GET /articles/search) на сгенерированном корпусе.
+
+    POSTGRES_DB=piit_bench python -m bench.article_search --articles 50000
+
+Для сравнения замеряется поиск подстроки через ILIKE по заголовку и тексту — так искали бы без search_vector.
+"""
+import argparse
+import random
+from datetime import date
+from sqlalchemy import or_
+from app.dao.models import Article
+from app.service.article_service import ArticleService
+from bench.article_corpus import seed_articles, build_vocabulary
+from bench.common import open_bench_session, measure, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=50000)
+    parser.add_argument("--content-words", type=int, default=150, help="средняя длина текста статьи в словах")
+    parser.add_argument("--limit", type=int, default=20, help="размер страницы")
+    parser.add_argument("--pages", type=int, default=5, help="сколько страниц листать курсором")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="использовать уже загруженный корпус")
+    args = parser.parse_args()
+
+    db = open_bench_session()
+    try:
+        if args.skip_seed:
+            vocabulary = build_vocabulary(20000, random.Random(42))
+        else:
+            vocabulary = seed_articles(db, args.articles, args.content_words)
+        service = ArticleService(db)
+        year = date.today().year - 3
+
+        def search(q: str, year_min=None, year_max=None, tags=None, pages: int = 1) -> int:
+            found, cursor = 0, None
+            for _ in range(pages):
+                page = service.search_articles(q, year_min, year_max, None, None, tags, args.limit, cursor=cursor)
+                found += len(page.items)
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+            db.rollback()
+            return found
+
+        def substring_scan(word: str) -> int:
+            pattern = f"%{word}%"
+            found = (db.query(Article.id)
+                     .filter(or_(Article.title.ilike(pattern), Article.content.ilike(pattern)))
+                     .order_by(Article.event_date.desc(), Article.id.desc())
+                     .limit(args.limit)
+                     .all())
+            db.rollback()
+            return len(found)
+
+        frequent, common, rare = vocabulary[0], vocabulary[200], vocabulary[15000]
+        cases = [
+            ("частое слово", lambda: search(frequent)),
+            ("слово средней частоты", lambda: search(common)),
+            ("редкое слово", lambda: search(rare)),
+            ("два слова", lambda: search(f"{vocabulary[5]} {vocabulary[300]}")),
+            ("фраза", lambda: search(f'"{vocabulary[0]} {vocabulary[1]}"')),
+            ("слово без другого", lambda: search(f"{vocabulary[10]} -{vocabulary[0]}")),
+            (f"частое слово, {year} год", lambda: search(frequent, year, year)),
+            ("частое слово, тег", lambda: search(frequent, tags=["Наука"])),
+            (f"частое слово, {args.pages} стр.", lambda: search(frequent, pages=args.pages)),
+            ("ILIKE: частое слово", lambda: substring_scan(frequent)),
+            ("ILIKE: редкое слово", lambda: substring_scan(rare)),
+        ]
+        rows = [
+            {"case": name, "found": run(), **measure(run, args.repeat)}
+            for name, run in cases
+        ]
+        print_table(f"Поиск по {args.articles} статьям, страница {args.limit}", rows)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Бенчмарк вида summary для списков статей (GET /articles, GET /articles/search): время, данные из БД и размер ответа.
+
+    POSTGRES_DB=piit_bench python -m bench.article_summary --articles 50000
+
+Для каждого случая замеряются оба вида: full (с полным текстом) и summary (без текста, с отрывком).
+"""
+import argparse
+import random
+from app.api.dto import ArticleView
+from app.service.article_service import ArticleService
+from bench.article_corpus import seed_articles, build_vocabulary
+from bench.common import open_bench_session, measure, print_table, result_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=50000)
+    parser.add_argument("--content-words", type=int, default=800, help="средняя длина текста статьи в словах")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="использовать уже загруженный корпус")
+    args = parser.parse_args()
+
+    db = open_bench_session()
+    try:
+        if args.skip_seed:
+            vocabulary = build_vocabulary(20000, random.Random(42))
+        else:
+            vocabulary = seed_articles(db, args.articles, args.content_words)
+        service = ArticleService(db)
+
+        def list_page(limit: int, page: int = 1, tags: list[str] | None = None):
+            return lambda view: service.get_articles_page(None, None, None, None, tags, page, limit, view=view)
+
+        def search_page(limit: int):
+            return lambda view: service.search_articles(vocabulary[0], None, None, None, None, None, limit, view=view)
+
+        cases = [
+            ("список, 20", list_page(20)),
+            ("список, 100", list_page(100)),
+            ("список, 20, стр. 50", list_page(20, page=50)),
+            ("список, 20, тег", list_page(20, tags=["Наука"])),
+            ("поиск, 20", search_page(20)),
+        ]
+        rows = []
+        for name, fetch in cases:
+            for view in (ArticleView.full, ArticleView.summary):
+                def run():
+                    fetch(view)
+                    db.rollback()
+
+                run()  # прогрев: индекс тегов строится при первом запросе
+                rows.append({
+                    "case": name,
+                    "view": view.value,
+                    "db_kib": result_bytes(db, run) / 1024,
+                    "response_kib": len(fetch(view).model_dump_json()) / 1024,
+                    **measure(run, args.repeat),
+                })
+                db.rollback()
+        print_table(f"Списки статей: {args.articles} статей, ~{args.content_words} слов в тексте", rows)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Бенчмарк записи справочников БРС при полной синхронизации: set-based путь (BrsSyncDAO) против прежнего ORM-пути.
+
+    POSTGRES_DB=piit_bench python -m bench.brs_sync --units 100000
+
+Ответы БРС генерируются, сеть не используется. Каждый путь проходит одни и те же сценарии с пустой базы:
+первичная загрузка, повтор без изменений и повтор с изменёнными, удалёнными и новыми записями.
+"""
+import argparse
+import copy
+import random
+import statistics
+import time
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.config.config import settings
+from app.dao.models import Teacher, Subject, StudGroup, CurriculumUnit, TeacherCurriculumUnitLink
+from app.service.common.brs_records import FIELD_RENAMES, brs_fingerprint
+from app.service.common.data_sync_manager import DataSyncManager
+from app.service.common.utils import ProbeResult
+from bench.common import open_bench_session, print_table, analyze
+
+FOUND = (2025, 1)
+SYNC_TABLES = ("teacher_curriculum_unit_link", "curriculum_units", "stud_groups", "subjects", "teachers")
+
+
+class BulkSync(DataSyncManager):
+    """
+    DataSyncManager, который вместо запросов к БРС возвращает заранее сгенерированные ответы.
+    """
+
+    def __init__(self, db: Session, payload: dict[str, list[dict]]):
+        super().__init__(db)
+        self.payload = payload
+
+    def _fetch_all(self, last_found):
+        return (
+            self.payload["teachers"],
+            self.payload["subjects"],
+            ProbeResult(self.payload["groups"], FOUND),
+            ProbeResult(self.payload["units"], FOUND),
+        )
+
+
+class LegacyOrmSync:
+    """
+    Прежний ORM-путь записи, заменённый BrsSyncDAO: все строки таблицы загружаются в identity map,
+    изменения применяются к объектам по одному, лишние строки удаляются через db.delete.
+    """
+
+    def __init__(self, db: Session, payload: dict[str, list[dict]]):
+        self.db = db
+        self.payload = payload
+
+    def sync_all(self) -> dict[str, dict[str, int]]:
+        teachers, subjects = self.payload["teachers"], self.payload["subjects"]
+        groups, units = self.payload["groups"], self.payload["units"]
+        with self.db.begin():
+            self._clean_links(teachers, units)
+            report = {
+                Teacher.__tablename__: self._sync_entities(Teacher, teachers),
+                Subject.__tablename__: self._sync_entities(Subject, subjects),
+                StudGroup.__tablename__: self._sync_entities(StudGroup, groups),
+                CurriculumUnit.__tablename__: self._sync_entities(CurriculumUnit, units),
+            }
+            self.db.flush()
+            self._rebuild_links()
+        return report
+
+    def _clean_links(self, teachers: list[dict], units: list[dict]):
+        teacher_brs_ids = {t["id"] for t in teachers}
+        unit_brs_ids = {u["id"] for u in units}
+        teacher_ids = [t.id for t in self.db.query(Teacher).filter(~Teacher.brs_id.in_(teacher_brs_ids))]
+        unit_ids = [u.id for u in self.db.query(CurriculumUnit).filter(~CurriculumUnit.brs_id.in_(unit_brs_ids))]
+        if teacher_ids:
+            self.db.query(TeacherCurriculumUnitLink).filter(
+                TeacherCurriculumUnitLink.teacher_id.in_(teacher_ids)
+            ).delete(synchronize_session=False)
+        if unit_ids:
+            self.db.query(TeacherCurriculumUnitLink).filter(
+                TeacherCurriculumUnitLink.curriculum_unit_id.in_(unit_ids)
+            ).delete(synchronize_session=False)
+
+    def _sync_entities(self, model, new_data: list[dict]) -> dict[str, int]:
+        existing = {obj.brs_id: obj for obj in self.db.query(model).all()}
+        new_ids = set()
+        stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        model_columns = {col.name for col in model.__table__.columns}
+
+        for item in new_data:
+            brs_id = item.get("id")
+            new_ids.add(brs_id)
+            obj = existing.get(brs_id)
+            item["brs_id"] = item.pop("id")
+
+            for old_key, new_key in FIELD_RENAMES.get(model, {}).items():
+                if old_key in item:
+                    item[new_key] = item.pop(old_key)
+            item = {key: value for key, value in item.items() if key in model_columns}
+            if model is Teacher and obj:
+                item.pop("icon", None)
+            item["brs_fingerprint"] = brs_fingerprint(model, item)
+            if obj:
+                if obj.brs_fingerprint == item["brs_fingerprint"]:
+                    stats["unchanged"] += 1
+                    continue
+                for key, value in item.items():
+                    setattr(obj, key, value)
+                stats["updated"] += 1
+            else:
+                if model is Teacher and item.get("icon") is None:
+                    if item.get("gender") == "M":
+                        item["icon"] = settings.DEFAULT_MAN_ICON
+                    elif item.get("gender") == "W":
+                        item["icon"] = settings.DEFAULT_WOMAN_ICON
+                self.db.add(model(**item))
+                stats["inserted"] += 1
+
+        to_delete = [obj for brs, obj in existing.items() if brs not in new_ids]
+        for obj in to_delete:
+            self.db.delete(obj)
+        stats["deleted"] = len(to_delete)
+        return stats
+
+    def _rebuild_links(self):
+        teachers_by_brs_id = {t.brs_id: t.id for t in self.db.query(Teacher.id, Teacher.brs_id).all()}
+        existing_links = set(self.db.query(
+            TeacherCurriculumUnitLink.teacher_id,
+            TeacherCurriculumUnitLink.curriculum_unit_id,
+            TeacherCurriculumUnitLink.is_practice
+        ).all())
+        new_links = []
+        for unit in self.db.query(CurriculumUnit).all():
+            main_id = teachers_by_brs_id.get(unit.teacher_brs_id)
+            if main_id and (main_id, unit.id, False) not in existing_links:
+                new_links.append(TeacherCurriculumUnitLink(
+                    teacher_id=main_id, curriculum_unit_id=unit.id, is_practice=False
+                ))
+            for brs_id in unit.practice_teacher_brs_ids or []:
+                practice_id = teachers_by_brs_id.get(brs_id)
+                if practice_id and (practice_id, unit.id, True) not in existing_links:
+                    new_links.append(TeacherCurriculumUnitLink(
+                        teacher_id=practice_id, curriculum_unit_id=unit.id, is_practice=True
+                    ))
+        self.db.bulk_save_objects(new_links)
+
+
+def generate_payload(rng: random.Random, units: int) -> dict[str, list[dict]]:
+    """
+    Ответы БРС в формате API: преподаватели, дисциплины и группы в пропорциях к числу учебных единиц.
+    """
+    teachers = [_teacher(rng, brs_id) for brs_id in range(1, max(units // 60, 10) + 1)]
+    subjects = [{"id": brs_id, "name": f"Дисциплина {brs_id}"} for brs_id in range(1, max(units // 25, 10) + 1)]
+    groups = [
+        {"id": brs_id, "course": rng.randint(1, 6), "semester": rng.randint(1, 12),
+         "education_level": rng.choice(["bachelor", "master", "specialist"])}
+        for brs_id in range(1, max(units // 50, 10) + 1)
+    ]
+    payload = {"teachers": teachers, "subjects": subjects, "groups": groups, "units": []}
+    payload["units"] = [_unit(rng, brs_id, payload) for brs_id in range(1, units + 1)]
+    return payload
+
+
+def mutate_payload(rng: random.Random, payload: dict[str, list[dict]]) -> dict[str, list[dict]]:
+    """
+    Следующий ответ БРС: 5% учебных единиц изменены, 1% удалены и 1% добавлены,
+    2% преподавателей изменены и 1% добавлены.
+    """
+    payload = copy.deepcopy(payload)
+    units = payload["units"]
+    for unit in rng.sample(units, len(units) // 20):
+        unit["mark_type"] = "exam" if unit["mark_type"] == "credit" else "credit"
+    removed = set(rng.sample(range(len(units)), len(units) // 100))
+    payload["units"] = [unit for i, unit in enumerate(units) if i not in removed]
+
+    teachers = payload["teachers"]
+    for teacher in rng.sample(teachers, max(len(teachers) // 50, 1)):
+        teacher["rank"] = "Профессор" if teacher["rank"] != "Профессор" else "Доцент"
+    next_teacher_id = max(t["id"] for t in teachers) + 1
+    teachers.extend(
+        _teacher(rng, brs_id) for brs_id in range(next_teacher_id, next_teacher_id + max(len(teachers) // 100, 1))
+    )
+    next_unit_id = max(u["id"] for u in units) + 1
+    payload["units"].extend(
+        _unit(rng, brs_id, payload) for brs_id in range(next_unit_id, next_unit_id + len(units) // 100)
+    )
+    return payload
+
+
+def reset(db: Session):
+    db.execute(text(f"TRUNCATE {', '.join(SYNC_TABLES)}, brs_probe_states RESTART IDENTITY CASCADE"))
+    db.commit()
+
+
+def table_checksums(db: Session) -> dict[str, str]:
+    """
+    Контрольные суммы синхронизированных таблиц, не зависящие от суррогатных id: по ним сравниваются результаты путей.
+    """
+    checksums = {
+        table: db.execute(text(
+            f"SELECT md5(coalesce(string_agg(brs_id || ':' || brs_fingerprint || ':' || "
+            f"coalesce({'icon' if table == 'teachers' else 'NULL'}, ''), ',' ORDER BY brs_id), '')) FROM {table}"
+        )).scalar()
+        for table in SYNC_TABLES[1:]
+    }
+    checksums["teacher_curriculum_unit_link"] = db.execute(text(
+        "SELECT md5(coalesce(string_agg(t.brs_id || ':' || u.brs_id || ':' || l.is_practice, ',' "
+        "ORDER BY t.brs_id, u.brs_id, l.is_practice), '')) "
+        "FROM teacher_curriculum_unit_link l "
+        "JOIN teachers t ON t.id = l.teacher_id JOIN curriculum_units u ON u.id = l.curriculum_unit_id"
+    )).scalar()
+    db.commit()
+    return checksums
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--units", type=int, default=100000, help="число учебных единиц")
+    parser.add_argument("--rounds", type=int, default=3, help="сколько раз пройти сценарии каждым путём")
+    parser.add_argument("--skip-legacy", action="store_true", help="не замерять прежний ORM-путь")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    initial = generate_payload(rng, args.units)
+    changed = mutate_payload(rng, initial)
+    scenarios = [("первичная загрузка", initial), ("без изменений", initial), ("с изменениями", changed)]
+    paths = [("bulk", BulkSync)] + ([] if args.skip_legacy else [("orm", LegacyOrmSync)])
+
+    db = open_bench_session()
+    try:
+        rows, checksums = [], {}
+        for path, sync_class in paths:
+            timings: dict[str, list[float]] = {name: [] for name, _ in scenarios}
+            reports = {}
+            for _ in range(args.rounds):
+                reset(db)
+                for name, payload in scenarios:
+                    # Прежний путь изменяет записи на месте, поэтому каждый запуск получает свою копию
+                    sync = sync_class(db, copy.deepcopy(payload))
+                    started = time.perf_counter()
+                    reports[name] = sync.sync_all()
+                    timings[name].append(time.perf_counter() - started)
+                    analyze(db, *SYNC_TABLES)
+            checksums[path] = table_checksums(db)
+            for name, _ in scenarios:
+                units_report = reports[name][CurriculumUnit.__tablename__]
+                rows.append({
+                    "path": path,
+                    "scenario": name,
+                    "median_s": statistics.median(timings[name]),
+                    "min_s": min(timings[name]),
+                    "units_ins/upd/del": "/".join(str(units_report[key]) for key in ("inserted", "updated", "deleted")),
+                })
+        print_table(f"Синхронизация: {args.units} учебных единиц, {args.rounds} прогона", rows)
+        if len(checksums) > 1:
+            mismatched = [table for table in checksums["bulk"] if checksums["bulk"][table] != checksums["orm"][table]]
+            print("\nРезультаты путей совпадают" if not mismatched else f"\nРезультаты путей различаются: {mismatched}")
+    finally:
+        db.close()
+
+
+def _teacher(rng: random.Random, brs_id: int) -> dict:
+    gender = rng.choice(["M", "W"])
+    return {
+        "id": brs_id,
+        "academic_degree": rng.choice([None, "к.т.н.", "д.т.н."]),
+        "department_id": rng.randint(1, 5),
+        "department_leader": False,
+        "department_part_time_job_ids": [],
+        "department_secretary": False,
+        "firstname": f"Имя{brs_id}",
+        "gender": gender,
+        "middlename": f"Отчество{brs_id}",
+        "person_id": 100000 + brs_id,
+        "rank": rng.choice(["Доцент", "Профессор", "Старший преподаватель"]),
+        "rank_short": None,
+        "surname": f"Фамилия{brs_id}",
+    }
+
+
+def _unit(rng: random.Random, brs_id: int, payload: dict[str, list[dict]]) -> dict:
+    teacher_ids = [t["id"] for t in rng.sample(payload["teachers"], 3)]
+    return {
+        "id": brs_id,
+        "practice_teacher_ids": teacher_ids[1:rng.randint(1, 3)],
+        "mark_type": rng.choice(["exam", "credit"]),
+        "stud_group_id": rng.choice(payload["groups"])["id"],
+        "subject_id": rng.choice(payload["subjects"])["id"],
+        "teacher_id": teacher_ids[0],
+    }
+
+
+if __name__ == "__main__":
+    main()
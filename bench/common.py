@@ -0,0 +1,102 @@
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.config.config import settings
+from app.dao.db_config import SessionLocal, engine
+
+
+def open_bench_session() -> Session:
+    """
+    Открывает сессию к базе для бенчмарков. Бенчмарки очищают таблицы, поэтому запускаются
+    только на отдельной базе, в названии которой есть "bench".
+    """
+    if "bench" not in (settings.POSTGRES_DB or ""):
+        raise SystemExit(
+            f"POSTGRES_DB={settings.POSTGRES_DB!r}: бенчмарки очищают таблицы, "
+            f"укажите отдельную базу с 'bench' в названии (см. bench/README.md)"
+        )
+    return SessionLocal()
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> dict[str, float]:
+    """
+    Вызывает `fn` `warmup` раз без замеров, затем `repeat` раз с замером.
+    Возвращает медиану и 95-й перцентиль времени в миллисекундах.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, round(0.95 * (len(timings) - 1)))],
+    }
+
+
+@contextmanager
+def captured_statements() -> Iterator[list[tuple[str, Any]]]:
+    """
+    Собирает SQL-запросы (текст и параметры), выполненные через engine внутри блока.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def result_bytes(db: Session, fn: Callable[[], Any]) -> int:
+    """
+    Выполняет `fn` и оценивает объём данных, которые вернули её запросы: для каждого SELECT
+    суммируется длина текстового представления строк результата (примерно столько передаётся клиенту).
+    """
+    with captured_statements() as statements:
+        fn()
+    total = 0
+    cursor = db.connection().connection.cursor()
+    try:
+        for statement, parameters in statements:
+            if statement.lstrip().upper().startswith("SELECT"):
+                cursor.execute(f"SELECT coalesce(sum(octet_length(t::text)), 0) FROM ({statement}) AS t", parameters)
+                total += cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    return total
+
+
+def print_table(title: str, rows: list[dict]):
+    """
+    Печатает результаты в виде таблицы с колонками по ключам первой строки.
+    """
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[_format_cell(row[name]) for name in columns] for row in rows]
+    widths = [max(len(name), *(len(line[i]) for line in cells)) for i, name in enumerate(columns)]
+    print("  ".join(name.ljust(width) for name, width in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)))
+
+
+def analyze(db: Session, *tables: str):
+    db.execute(text(f"ANALYZE {', '.join(tables)}"))
+    db.commit()
+
+
+def _format_cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
@@ -1,10 +1,14 @@
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
-from starlette.staticfiles import StaticFiles
 import uvicorn
 from app.api.routers import teachers_router, tags_router, articles_router, cur_units_router, subjects_router, \
-    stud_groups_router, sync_router, auth_router
-from app.service.common.scheduler import create_scheduler
+    stud_groups_router, sync_router, auth_router, metrics_router
+from app.api.middleware import UploadSizeLimitMiddleware
+from app.api.static_files import create_static_files
+from app.config.config import settings
+from app.service.common.brs_client import brs_client
+from app.service.common.leader import scheduler_lease
+from app.service.common.scheduler import create_scheduler, flush_article_views
 
 
 def get_app() -> FastAPI:
@@ -15,6 +19,9 @@ def get_app() -> FastAPI:
 
     async def on_shutdown():
         scheduler.shutdown(wait=True)
+        scheduler_lease.release()
+        flush_article_views()
+        brs_client.close()
 
     app = FastAPI(
         on_startup=[on_startup],
@@ -28,12 +35,16 @@ def get_app() -> FastAPI:
     app.include_router(stud_groups_router)
     app.include_router(sync_router)
     app.include_router(auth_router)
-    app.mount("/static", StaticFiles(directory="resources/static"), name="static")
+    app.include_router(metrics_router)
+    app.mount("/static", create_static_files(directory="resources/static"), name="static")
+    # Добавленный позже middleware оборачивает ранее добавленные: CORS должен снабдить заголовками и ответ 413
+    app.add_middleware(UploadSizeLimitMiddleware, max_upload_size=settings.MAX_UPLOAD_SIZE_BYTES)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
     return app
 
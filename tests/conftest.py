@@ -0,0 +1,112 @@
+import os
+
+# Настройки читаются при импорте app.config; движок Postgres создаётся лениво и в тестах не подключается
+for name, value in {
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "UPLOAD_DIR": "/tmp",
+    "TEACHERS_URI": "http://brs.test/teachers",
+    "SUBJECTS_URI": "http://brs.test/subjects",
+    "STUB_GROUPS_URI": "http://brs.test/groups/{year}/{session_num}",
+    "CUR_UNITS_URI": "http://brs.test/units/{year}/{session_num}",
+    "SECRET_KEY": "test",
+    "DEFAULT_ARTICLE_ICON": "/static/icons/default_article.png",
+    "DEFAULT_MAN_ICON": "/static/icons/default_man.png",
+    "DEFAULT_WOMAN_ICON": "/static/icons/default_woman.png",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+from sqlalchemy import MetaData, TEXT, create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def sqlite_session():
+    """
+    Фабрика сессий SQLite в памяти с заданными таблицами моделей.
+    """
+    engines = []
+    sessions = []
+
+    def make(*models):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        for model in models:
+            model.__table__.create(engine)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        engines.append(engine)
+        sessions.append(session)
+        return session
+
+    yield make
+    for session in sessions:
+        session.close()
+    for engine in engines:
+        engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def create_article_schema():
+    """
+    Создаёт в SQLite таблицы статей и тегов. Колонка search_vector создаётся простым текстом:
+    tsvector и его вычисление SQLite не поддерживает.
+    """
+    from app.dao.models import Article, ArticleTagAssociation, Tag
+
+    def create(engine):
+        metadata = MetaData()
+        for table in (Tag.__table__, Article.__table__, ArticleTagAssociation.__table__):
+            table.to_metadata(metadata)
+        search_vector = metadata.tables[Article.__tablename__].c.search_vector
+        search_vector.computed = None
+        search_vector.server_default = None
+        search_vector.type = TEXT()
+        metadata.create_all(engine)
+
+    return create
+
+
+@pytest.fixture(scope="session")
+def postgres_engine():
+    """
+    Движок тестовой базы Postgres из TEST_DATABASE_URL со схемой из моделей.
+    Без TEST_DATABASE_URL или при недоступной базе тесты с этой фикстурой пропускаются.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL не задан")
+    from sqlalchemy.exc import OperationalError
+    from app.dao.db_config import Base
+    import app.dao.models  # noqa: F401 — регистрирует таблицы в Base.metadata
+
+    engine = create_engine(url)
+    try:
+        engine.connect().close()
+    except OperationalError as e:
+        engine.dispose()
+        pytest.skip(f"Postgres недоступен: {e}")
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def postgres_session(postgres_engine):
+    """
+    Сессия тестовой базы Postgres; перед тестом все таблицы очищаются.
+    """
+    from sqlalchemy import text
+    from app.dao.db_config import Base
+
+    with postgres_engine.begin() as connection:
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        connection.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    session = sessionmaker(autocommit=False, autoflush=False, bind=postgres_engine)()
+    yield session
+    session.close()
@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+import app.service.common.brs_client as brs_module
+from app.service.common.brs_client import BrsClient, BrsDeadlineExceeded, sync_deadline
+from app.service.common.metrics import Metrics
+
+
+class StandInBrs(ThreadingHTTPServer):
+    """
+    Локальный HTTP-сервер вместо БРС. Отвечает по очереди заданными ответами (код и задержка в секундах),
+    затем 200 без задержки. Считает запросы и принятые TCP-соединения.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.script: list[tuple[int, float]] = []
+        self.requests: list[str] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def respond(self, *responses: tuple[int, float]):
+        self.script.extend(responses)
+
+    def next_response(self, path: str) -> tuple[int, float]:
+        with self._lock:
+            self.requests.append(path)
+            return self.script.pop(0) if self.script else (200, 0)
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def handle_error(self, request, client_address):
+        # Клиент закрывает соединение по тайм-ауту раньше, чем сервер отвечает
+        pass
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count_connection()
+
+    def do_GET(self):
+        status, delay = self.server.next_response(self.path)
+        if delay:
+            time.sleep(delay)
+        body = json.dumps({"ok": status == 200}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = StandInBrs()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(brs_module, "metrics", metrics)
+    return metrics
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(timeout: float = 5, max_retries: int = 3, base_delay: float = 0.01, max_delay: float = 0.05) -> BrsClient:
+        client = BrsClient(
+            timeout=timeout,
+            connect_timeout=timeout,
+            max_retries=max_retries,
+            retry_base_delay=base_delay,
+            retry_max_delay=max_delay,
+            max_connections=2,
+        )
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_retries_5xx_until_success(server, metrics, make_client):
+    server.respond((503, 0), (502, 0), (500, 0))
+
+    response = make_client(max_retries=3).get(f"{server.url}/api/teachers")
+
+    assert response.status_code == 200
+    assert len(server.requests) == 4
+    counters = metrics.snapshot()["counters"]
+    assert counters["brs./api/teachers.errors"] == 3
+    assert counters["brs./api/teachers.retries"] == 3
+
+
+def test_backoff_is_exponential_and_capped(server, metrics, make_client, monkeypatch):
+    delays = []
+    monkeypatch.setattr(brs_module.time, "sleep", delays.append)
+    monkeypatch.setattr(brs_module.random, "uniform", lambda low, high: high)
+    server.respond(*[(500, 0)] * 5)
+
+    make_client(max_retries=5, base_delay=1, max_delay=3).get(f"{server.url}/api/subjects")
+
+    assert delays == [1, 2, 3, 3, 3]
+
+
+def test_returns_last_5xx_after_all_retries(server, metrics, make_client):
+    server.respond(*[(503, 0)] * 10)
+
+    response = make_client(max_retries=2).get(f"{server.url}/api/subjects")
+
+    assert response.status_code == 503
+    assert len(server.requests) == 3
+    assert metrics.snapshot()["counters"]["brs./api/subjects.retries"] == 2
+
+
+def test_does_not_retry_4xx(server, metrics, make_client):
+    server.respond((404, 0))
+
+    assert make_client().get(f"{server.url}/api/units/2026/2").status_code == 404
+    assert len(server.requests) == 1
+    assert "brs./api/units/2026/2.retries" not in metrics.snapshot()["counters"]
+
+
+def test_slow_response_times_out_and_is_retried(server, metrics, make_client):
+    server.respond((200, 1.0))
+    started = time.monotonic()
+
+    response = make_client(timeout=0.2, max_retries=2).get(f"{server.url}/api/teachers")
+
+    assert response.status_code == 200
+    assert time.monotonic() - started < 1.0
+    assert len(server.requests) == 2
+    counters = metrics.snapshot()["counters"]
+    assert counters["brs./api/teachers.errors"] == 1
+    assert counters["brs./api/teachers.retries"] == 1
+
+
+def test_read_timeout_is_raised_after_all_retries(server, metrics, make_client):
+    server.respond(*[(200, 1.0)] * 3)
+
+    with pytest.raises(httpx.ReadTimeout):
+        make_client(timeout=0.1, max_retries=2).get(f"{server.url}/api/teachers")
+    assert len(server.requests) == 3
+    assert metrics.snapshot()["counters"]["brs./api/teachers.errors"] == 3
+
+
+def test_sync_deadline_cuts_slow_request_short(server, metrics, make_client):
+    server.respond((200, 2.0))
+    client = make_client(timeout=10, max_retries=3, base_delay=0.5, max_delay=0.5)
+    started = time.monotonic()
+
+    with sync_deadline(0.3), pytest.raises(BrsDeadlineExceeded):
+        client.get(f"{server.url}/api/teachers")
+
+    assert time.monotonic() - started < 1.0
+    assert len(server.requests) == 1
+
+
+def test_expired_sync_deadline_stops_requests(server, metrics, make_client):
+    with sync_deadline(0), pytest.raises(BrsDeadlineExceeded):
+        make_client().get(f"{server.url}/api/teachers")
+    assert server.requests == []
+
+
+def test_sequential_requests_reuse_one_connection(server, metrics, make_client):
+    client = make_client()
+
+    for _ in range(5):
+        assert client.get(f"{server.url}/api/teachers").status_code == 200
+
+    assert len(server.requests) == 5
+    assert server.connections == 1
+    assert metrics.snapshot()["counters"]["brs.connections"] == 1
+
+
+def test_latency_is_recorded_per_endpoint(server, metrics, make_client):
+    client = make_client()
+
+    client.get(f"{server.url}/api/teachers")
+    client.get(f"{server.url}/api/units/2026/2", endpoint="/api/units/{year}/{session_num}")
+    client.get(f"{server.url}/api/units/2026/1", endpoint="/api/units/{year}/{session_num}")
+
+    timings = metrics.snapshot()["timings"]
+    assert timings["brs./api/teachers"]["count"] == 1
+    assert timings["brs./api/units/{year}/{session_num}"]["count"] == 2
+
+
+def test_download_streams_body_and_retries(server, metrics, make_client, tmp_path):
+    server.respond((502, 0))
+
+    with open(tmp_path / "body.json", "w+b") as file:
+        status = make_client().download(f"{server.url}/api/units/2026/2", file)
+        file.seek(0)
+        body = file.read()
+
+    assert status == 200
+    assert body == b'{"ok": true}'
+    assert len(server.requests) == 2
@@ -0,0 +1,102 @@
+import copy
+import pytest
+from sqlalchemy import event
+from app.dao.models import Subject, StudGroup, Teacher, CurriculumUnit
+from app.service.common.brs_records import to_sync_row
+from app.service.common.data_sync_manager import DataSyncManager
+from app.service.common.utils import ProbeResult
+from app.service.cur_unit_service import CurriculumUnitService
+from app.service.stud_group_service import StudGroupService
+from app.service.subject_service import SubjectService
+from app.service.teacher_service import TeacherService
+
+
+def _stale_rows(db, model, fingerprint: str) -> int:
+    # Условие, по которому upsert_staged перезаписывает строку при полной синхронизации
+    return db.query(model).filter(model.brs_fingerprint.is_distinct_from(fingerprint)).count()
+
+
+def _captured_statements(db) -> list[str]:
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_subject_sync_stores_full_sync_fingerprint(sqlite_session):
+    db = sqlite_session(Subject)
+    db.add(Subject(**to_sync_row(Subject, {"id": 1, "name": "Математика"})))
+    db.commit()
+    record = {"id": 1, "name": "Физика"}
+
+    SubjectService(db)._save_subjects([dict(record)])
+
+    subject = db.query(Subject).one()
+    assert subject.name == "Физика"
+    # БРС вернула те же данные: полная синхронизация не должна перезаписывать строку
+    assert _stale_rows(db, Subject, to_sync_row(Subject, record)["brs_fingerprint"]) == 0
+
+
+def test_new_group_gets_full_sync_fingerprint(sqlite_session):
+    db = sqlite_session(StudGroup)
+    record = {"id": 7, "course": 2, "semester": 3, "education_level": "bachelor"}
+
+    StudGroupService(db)._save_group([dict(record)])
+
+    assert _stale_rows(db, StudGroup, to_sync_row(StudGroup, record)["brs_fingerprint"]) == 0
+
+
+def test_unchanged_group_is_not_written(sqlite_session):
+    db = sqlite_session(StudGroup)
+    record = {"id": 7, "course": 2, "semester": 3, "education_level": "bachelor"}
+    StudGroupService(db)._save_group([dict(record)])
+    statements = _captured_statements(db)
+
+    StudGroupService(db)._save_group([dict(record)])
+
+    assert not [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+
+
+def _brs_payload(mark_type: str, rank: str, course: int, name: str) -> dict:
+    return {
+        "teachers": [{
+            "id": 10, "academic_degree": None, "department_id": 1, "department_leader": False,
+            "department_part_time_job_ids": [], "department_secretary": False, "firstname": "Иван",
+            "gender": "M", "middlename": "Иванович", "person_id": 100, "rank": rank, "rank_short": None,
+            "surname": "Иванов",
+        }],
+        "subjects": [{"id": 20, "name": name}],
+        "groups": [{"id": 30, "course": course, "semester": 1, "education_level": "bachelor"}],
+        "units": [{
+            "id": 40, "practice_teacher_ids": [10], "mark_type": mark_type, "stud_group_id": 30,
+            "subject_id": 20, "teacher_id": 10,
+        }],
+    }
+
+
+def _full_sync(db, payload: dict) -> dict[str, dict[str, int]]:
+    payload = copy.deepcopy(payload)
+    manager = DataSyncManager(db)
+    manager._fetch_all = lambda last_found: (
+        payload["teachers"],
+        payload["subjects"],
+        ProbeResult(payload["groups"], (2025, 1)),
+        ProbeResult(payload["units"], (2025, 1)),
+    )
+    return manager.sync_all()
+
+
+@pytest.mark.postgres
+def test_full_sync_after_per_entity_sync_updates_nothing(postgres_session):
+    db = postgres_session
+    _full_sync(db, _brs_payload("exam", "Доцент", 1, "Математика"))
+    changed = _brs_payload("credit", "Профессор", 2, "Физика")
+
+    TeacherService(db).synchronize_teachers(copy.deepcopy(changed["teachers"]))
+    SubjectService(db)._save_subjects(copy.deepcopy(changed["subjects"]))
+    StudGroupService(db)._save_group(copy.deepcopy(changed["groups"]))
+    CurriculumUnitService(db)._save_curriculum_unit(copy.deepcopy(changed["units"]))
+    report = _full_sync(db, changed)
+
+    for model in (Teacher, Subject, StudGroup, CurriculumUnit):
+        assert report[model.__tablename__] == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 1}
@@ -0,0 +1,87 @@
+import os
+import time
+import pytest
+import app.service.common.icon_store as icon_store
+from app.config.config import settings
+from app.service.common.icon_store import collect_icon_garbage
+
+DIGEST = "0123456789abcdef0123456789abcdef"
+ORPHAN_DIGEST = "fedcba9876543210fedcba9876543210"
+
+
+class FakeIconDAO:
+    referenced: set[str] = set()
+
+    def __init__(self, db):
+        pass
+
+    def get_referenced_icons(self) -> set[str]:
+        return set(self.referenced)
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "DEFAULT_ARTICLE_ICON", "/static/icons/default_article.png")
+    monkeypatch.setattr(settings, "DEFAULT_MAN_ICON", "/static/icons/man.png")
+    monkeypatch.setattr(settings, "DEFAULT_WOMAN_ICON", "/static/icons/woman.png")
+    monkeypatch.setattr(icon_store, "IconDAO", FakeIconDAO)
+    FakeIconDAO.referenced = set()
+    return tmp_path
+
+
+def _create(directory, *names, age: float = 86400):
+    mtime = time.time() - age
+    for name in names:
+        path = directory / name
+        path.write_bytes(b"data")
+        os.utime(path, (mtime, mtime))
+
+
+def test_deletes_only_unreferenced_icon_files(upload_dir):
+    FakeIconDAO.referenced = {f"/static/icons/{DIGEST}-full.jpg", "/static/icons/teacher_1_photo.png"}
+    kept = [
+        ".gitkeep",
+        "default_article.png", "man.png", "woman.png",
+        f"{DIGEST}-full.jpg", f"{DIGEST}-full.webp", f"{DIGEST}-thumb.webp",
+        "default_article.png.gz", "man.png.br",
+        "teacher_1_photo.png", "teacher_1_photo.png.br",
+        f"{DIGEST}-full.jpg.gz", f"{DIGEST}-full.webp.br",
+        "notes.txt", "notes.txt.gz", "logo.png",
+    ]
+    deleted = [
+        f"{ORPHAN_DIGEST}-full.jpg", f"{ORPHAN_DIGEST}-full.webp", f"{ORPHAN_DIGEST}-thumb.webp",
+        "teacher_2_old.png", "Новость_про_кафедру_фото.JPG",
+        # Предсжатые копии неиспользуемых иконок, в том числе уже удалённых ранее
+        f"{ORPHAN_DIGEST}-full.jpg.gz", f"{ORPHAN_DIGEST}-full.webp.br", "teacher_2_old.png.gz",
+        "teacher_3_gone.png.br",
+        # Временные файлы _save_atomically после падения
+        "upload.tmp", "tmpk3j9x_2a.tmp",
+    ]
+    _create(upload_dir, *kept, *deleted)
+
+    assert collect_icon_garbage(db=None, batch_size=100, grace_seconds=3600) == len(deleted)
+    assert sorted(os.listdir(upload_dir)) == sorted(kept)
+
+
+def test_keeps_bundled_defaults_without_settings(upload_dir, monkeypatch):
+    for name in ("DEFAULT_ARTICLE_ICON", "DEFAULT_MAN_ICON", "DEFAULT_WOMAN_ICON"):
+        monkeypatch.setattr(settings, name, None)
+    _create(upload_dir, "default_article.png", "man.png", "woman.png", "default_article.png.gz")
+
+    assert collect_icon_garbage(db=None, batch_size=100, grace_seconds=3600) == 0
+
+
+def test_skips_files_younger_than_grace_period(upload_dir):
+    young = [f"{ORPHAN_DIGEST}-full.jpg", f"{ORPHAN_DIGEST}-full.jpg.gz", "tmpk3j9x_2a.tmp"]
+    _create(upload_dir, *young, age=10)
+
+    assert collect_icon_garbage(db=None, batch_size=100, grace_seconds=3600) == 0
+    assert sorted(os.listdir(upload_dir)) == sorted(young)
+
+
+def test_respects_batch_size(upload_dir):
+    _create(upload_dir, *(f"teacher_{i}_photo.png" for i in range(5)))
+
+    assert collect_icon_garbage(db=None, batch_size=2, grace_seconds=3600) == 2
+    assert len(os.listdir(upload_dir)) == 3
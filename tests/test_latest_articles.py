@@ -0,0 +1,118 @@
+import json
+import random
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine, case, event, func, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import app.dao.entities.article_dao as article_dao
+from app.dao.entities.article_dao import ArticleDAO
+from app.dao.models import Article
+
+TODAY = date(2026, 3, 15)
+
+
+def baseline_ids(db, today: date, limit: int) -> list[int]:
+    """
+    Прежний запрос: один ORDER BY по всей таблице — удалённость от сегодня, будущие (включая сегодня)
+    раньше прошедших, event_date. Добавлен только разрыв равенства по id в порядке прохода по индексу
+    (по возрастанию для будущих, по убыванию для прошедших), без которого порядок не определён.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        days_diff = func.abs(func.julianday(Article.event_date) - func.julianday(today.isoformat()))
+    else:
+        days_diff = func.abs(Article.event_date - today)
+    upcoming = Article.event_date >= today
+    rows = (db.query(Article.id)
+            .order_by(days_diff,
+                      case((upcoming, 0), else_=1),
+                      Article.event_date,
+                      case((upcoming, Article.id), else_=-Article.id))
+            .limit(limit)
+            .all())
+    return [article_id for article_id, in rows]
+
+
+def seed_random_articles(db, rng: random.Random, today: date):
+    # Узкий диапазон дат даёт много совпадений по дате и по удалённости в обе стороны
+    spread = rng.choice([1, 3, 10, 400])
+    for article_id in rng.sample(range(1, 1000), rng.randint(0, 40)):
+        event_date = today + timedelta(days=rng.randint(-spread, spread))
+        db.add(Article(id=article_id, title=f"Статья {article_id}", event_date=event_date, content=""))
+    db.commit()
+
+
+def assert_dao_matches_baseline(db, seeds: range):
+    for seed in seeds:
+        db.query(Article).delete()
+        rng = random.Random(seed)
+        seed_random_articles(db, rng, TODAY)
+        limit = rng.randint(1, 10)
+
+        articles = ArticleDAO(db).get_latest_articles(limit)
+
+        assert [article.id for article in articles] == baseline_ids(db, TODAY, limit), f"seed={seed}"
+
+
+@pytest.fixture
+def article_session(create_article_schema, monkeypatch):
+    monkeypatch.setattr(article_dao, "moscow_today", lambda: TODAY)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    create_article_schema(engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_ties_prefer_upcoming_then_index_order(article_session):
+    for event_date, article_id in ((TODAY - timedelta(days=1), 5), (TODAY + timedelta(days=1), 9),
+                                   (TODAY - timedelta(days=1), 7), (TODAY + timedelta(days=1), 2), (TODAY, 4)):
+        article_session.add(Article(id=article_id, title=f"Статья {article_id}", event_date=event_date, content=""))
+    article_session.commit()
+
+    assert [article.id for article in ArticleDAO(article_session).get_latest_articles(5)] == [4, 2, 9, 7, 5]
+
+
+def test_dao_matches_baseline_query(article_session):
+    assert_dao_matches_baseline(article_session, range(50))
+
+
+@pytest.mark.postgres
+def test_dao_matches_baseline_query_on_postgres(postgres_session, monkeypatch):
+    monkeypatch.setattr(article_dao, "moscow_today", lambda: TODAY)
+    assert_dao_matches_baseline(postgres_session, range(50))
+
+
+def _index_scans(plan: dict) -> list[str]:
+    scans = [plan["Index Name"]] if "Index Name" in plan else []
+    for child in plan.get("Plans", []):
+        scans += _index_scans(child)
+    return scans
+
+
+@pytest.mark.postgres
+def test_both_scans_use_event_date_index(postgres_session, monkeypatch):
+    monkeypatch.setattr(article_dao, "moscow_today", lambda: TODAY)
+    db = postgres_session
+    db.execute(text(
+        "INSERT INTO articles (title, content, event_date, views, created_at) "
+        "SELECT 'Статья ' || n, '', DATE :today + (n % 4000 - 2000), 0, now() FROM generate_series(1, 20000) AS n"
+    ), {"today": TODAY})
+    db.commit()
+    db.execute(text("ANALYZE articles"))
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        ArticleDAO(db).get_latest_articles(6)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    statement, parameters = next((s, p) for s, p in statements if "FROM articles" in s)
+    cursor = db.connection().connection.cursor()
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = cursor.fetchone()[0]
+    plan = plan if isinstance(plan, list) else json.loads(plan)
+
+    assert _index_scans(plan[0]["Plan"]).count("ix_articles_event_date_id") == 2
@@ -0,0 +1,99 @@
+from datetime import datetime
+import pytest
+from app.config.config import settings
+from app.service.common.utils import _probe_until_found
+
+
+@pytest.fixture
+def probe_settings(monkeypatch):
+    def configure(floor_year: int, budget: int, batch_size: int):
+        monkeypatch.setattr(settings, "BRS_PROBE_FLOOR_YEAR", floor_year)
+        monkeypatch.setattr(settings, "BRS_PROBE_BUDGET", budget)
+        monkeypatch.setattr(settings, "BRS_PROBE_BATCH_SIZE", batch_size)
+
+    return configure
+
+
+def _candidates(count: int) -> list[tuple[int, int]]:
+    year = datetime.now().year
+    return [(year - i // 2, 2 - i % 2) for i in range(count)]
+
+
+class FakeBrs:
+    """
+    fetch_fn для _probe_until_found: данные есть только у пар из `pages`.
+    """
+
+    def __init__(self, pages: dict[tuple[int, int], list]):
+        self.pages = pages
+        self.calls: list[tuple[int, int]] = []
+
+    def __call__(self, year: int, session_num: int) -> list:
+        self.calls.append((year, session_num))
+        return self.pages.get((year, session_num), [])
+
+
+def test_found_on_last_pair_of_budget_fetches_successor(probe_settings):
+    probe_settings(floor_year=datetime.now().year - 10, budget=4, batch_size=4)
+    pairs = _candidates(5)
+    brs = FakeBrs({pairs[3]: ["found"], pairs[4]: ["next"]})
+
+    pages, found = _probe_until_found("url", brs, None)
+
+    assert found == pairs[3]
+    assert pages == [["found"], ["next"]]
+    assert sorted(brs.calls) == sorted(pairs[:5])
+
+
+def test_hint_fetches_only_pairs_up_to_successor(probe_settings):
+    probe_settings(floor_year=datetime.now().year - 10, budget=12, batch_size=4)
+    pairs = _candidates(4)
+    brs = FakeBrs({pairs[2]: ["found"], pairs[3]: ["next"]})
+
+    pages, found = _probe_until_found("url", brs, pairs[2])
+
+    assert found == pairs[2]
+    assert pages == [["found"], ["next"]]
+    assert sorted(brs.calls) == sorted(pairs)
+
+
+def test_stale_hint_continues_search(probe_settings):
+    probe_settings(floor_year=datetime.now().year - 10, budget=12, batch_size=2)
+    pairs = _candidates(6)
+    brs = FakeBrs({pairs[4]: ["found"]})
+
+    pages, found = _probe_until_found("url", brs, pairs[0])
+
+    assert found == pairs[4]
+    assert pages == [["found"]]
+    assert len(brs.calls) == 6
+
+
+def test_floor_year_stops_search(probe_settings):
+    probe_settings(floor_year=datetime.now().year - 1, budget=12, batch_size=4)
+    brs = FakeBrs({})
+
+    with pytest.raises(RuntimeError, match="No data found"):
+        _probe_until_found("url", brs, None)
+    assert sorted(brs.calls) == sorted(_candidates(4))
+
+
+def test_data_on_floor_pair_is_returned_alone(probe_settings):
+    probe_settings(floor_year=datetime.now().year - 1, budget=12, batch_size=4)
+    pairs = _candidates(4)
+    brs = FakeBrs({pairs[3]: ["oldest"]})
+
+    pages, found = _probe_until_found("url", brs, None)
+
+    assert found == pairs[3]
+    assert pages == [["oldest"]]
+    assert len(brs.calls) == 4
+
+
+def test_budget_exhausted_without_data(probe_settings):
+    probe_settings(floor_year=datetime.now().year - 10, budget=3, batch_size=2)
+    brs = FakeBrs({})
+
+    with pytest.raises(RuntimeError, match="after 3 requests"):
+        _probe_until_found("url", brs, None)
+    assert len(brs.calls) == 3
@@ -0,0 +1,52 @@
+import asyncio
+import io
+import os
+import pytest
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+from app.config.config import settings
+from app.service.common.utils import save_icon_file, UploadTooLargeError
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _upload(data: bytes, content_type: str = "image/png") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename="photo.png", headers=Headers({"content-type": content_type}))
+
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 24), "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_renders_icon_from_uploaded_file(upload_dir):
+    icon_path = asyncio.run(save_icon_file(_upload(_png())))
+
+    name = icon_path.removeprefix("/static/icons/")
+    assert name.endswith("-full.jpg")
+    assert name in os.listdir(upload_dir)
+
+
+def test_same_content_gets_same_name(upload_dir):
+    data = _png()
+
+    assert asyncio.run(save_icon_file(_upload(data))) == asyncio.run(save_icon_file(_upload(data)))
+
+
+def test_rejects_too_large_upload(upload_dir, monkeypatch):
+    data = _png()
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE_BYTES", len(data) - 1)
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_icon_file(_upload(data)))
+    assert os.listdir(upload_dir) == []
+
+
+def test_rejects_non_image(upload_dir):
+    with pytest.raises(ValueError):
+        asyncio.run(save_icon_file(_upload(b"text", content_type="text/plain")))
@@ -0,0 +1,131 @@
+"""
+Число SQL-запросов на чтение статей. Тест фиксирует точное число запросов на каждый эндпоинт:
+N+1 (например, ленивая загрузка тегов для каждой статьи) или лишний запрос роняет CI.
+Эндпоинты, которым нужен Postgres (полнотекстовый поиск, GROUPING SETS в фасетах), здесь не проверяются.
+"""
+from datetime import timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.dao.entities.article_dao import moscow_today
+from app.dao.models import Article, ArticleTagAssociation, Tag
+from app.dao.session import get_db
+from app.service.common.cache import article_facets_cache, latest_articles_cache, popular_articles_cache
+from app.service.common.tag_index import tag_index
+from main import app
+
+ARTICLES = 30
+TODAY = moscow_today()
+YEAR = TODAY.year
+
+# Эндпоинт -> ожидаемое число запросов при пустых кэшах
+EXPECTED_STATEMENTS = {
+    "/articles/latest": 2,
+    "/articles/popular": 2,
+    "/articles/1": 1,
+    "/articles/": 2,
+    "/articles/?limit=20&view=summary": 2,
+    "/articles/?page=2": 2,
+    f"/articles/?year_min={YEAR - 1}&year_max={YEAR}": 2,
+    f"/articles/?year_min={YEAR - 1}&year_max={YEAR}&month_min=1&month_max=12&month_mode=continuous": 2,
+    # Построение индекса тегов (2 запроса) + id и даты статей + страница + теги страницы
+    "/articles/?tags=tag1": 5,
+    "/articles/?tags=tag1&tags=tag2": 5,
+    "/tags/": 1,
+}
+# Повторный запрос с уже построенным индексом тегов
+EXPECTED_WARM_STATEMENTS = {
+    "/articles/?tags=tag1": 2,
+}
+
+
+@pytest.fixture(scope="module")
+def engine(create_article_schema):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    create_article_schema(engine)
+
+    db = sessionmaker(bind=engine)()
+    tags = [Tag(name=f"tag{i}") for i in range(3)]
+    db.add_all(tags)
+    for i in range(ARTICLES):
+        db.add(Article(
+            title=f"Статья {i}",
+            content="Текст статьи " * 40,
+            event_date=TODAY + timedelta(days=(i - ARTICLES // 2) * 9),
+            icon="/static/icons/article.jpg",
+            views=i,
+            tag_associations=[ArticleTagAssociation(tag=tags[i % 3]), ArticleTagAssociation(tag=tags[(i + 1) % 3])],
+        ))
+    db.commit()
+    db.close()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def client(engine):
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    latest_articles_cache.invalidate()
+    article_facets_cache.invalidate()
+    popular_articles_cache.invalidate()
+    tag_index.invalidate()
+    app.dependency_overrides[get_db] = override_get_db
+    # Без контекстного менеджера: события startup (планировщик) в тестах не запускаются
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def _describe(executed: list[str]) -> str:
+    return "\n".join(statement.split(" FROM ")[0][:120] for statement in executed)
+
+
+@pytest.mark.parametrize("url", EXPECTED_STATEMENTS)
+def test_statement_count(client, statements, url):
+    response = client.get(url)
+
+    assert response.status_code == 200, response.text
+    assert response.json(), "эндпоинт должен вернуть данные, иначе число запросов ничего не проверяет"
+    assert len(statements) == EXPECTED_STATEMENTS[url], _describe(statements)
+
+
+@pytest.mark.parametrize("url", EXPECTED_WARM_STATEMENTS)
+def test_statement_count_with_warm_tag_index(client, statements, url):
+    client.get(url)
+    statements.clear()
+
+    response = client.get(url)
+
+    assert response.status_code == 200, response.text
+    assert len(statements) == EXPECTED_WARM_STATEMENTS[url], _describe(statements)
+
+
+@pytest.mark.parametrize("url", ["/articles/latest", "/articles/popular"])
+def test_article_blocks_are_cached(client, statements, url):
+    client.get(url)
+    statements.clear()
+
+    client.get(url)
+
+    assert statements == []
@@ -0,0 +1,68 @@
+import json
+import os
+import tracemalloc
+import pytest
+from app.config.config import settings
+from app.dao.models import CurriculumUnit
+from app.service.common.data_sync_manager import DataSyncManager
+from app.service.common.utils import iter_json_array
+
+UNITS = 200_000
+# Допустимый пик памяти потоковой синхронизации учебных единиц; переопределяется переменной окружения
+MEMORY_BUDGET_MIB = float(os.getenv("SYNC_STREAM_MEMORY_BUDGET_MIB", 40))
+
+
+class DiscardingSyncDAO:
+    """
+    Заменяет BrsSyncDAO: считает загруженные строки и не хранит их.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.chunks = 0
+
+    def create_staging(self, model, columns, keep_last=False):
+        self.columns = columns
+
+    def copy_to_staging(self, model, rows):
+        self.rows += len(rows)
+        self.chunks += 1
+
+
+@pytest.fixture(scope="module")
+def units_payload(tmp_path_factory):
+    path = tmp_path_factory.mktemp("brs") / "curriculum_units.json"
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{"ok": true, "curriculum_units": [')
+        for i in range(UNITS):
+            if i:
+                file.write(",")
+            json.dump({
+                "id": i,
+                "practice_teacher_ids": [i % 97, i % 89],
+                "mark_type": "exam" if i % 2 else "credit",
+                "stud_group_id": i % 500,
+                "subject_id": i % 2000,
+                "teacher_id": i % 300,
+                "semester": i % 8 + 1,
+            }, file, ensure_ascii=False)
+        file.write("]}")
+    return path
+
+
+def test_streamed_unit_sync_stays_within_memory_budget(units_payload):
+    manager = DataSyncManager.__new__(DataSyncManager)
+    manager.sync_dao = DiscardingSyncDAO()
+
+    with open(units_payload, "rb") as file:
+        tracemalloc.start()
+        try:
+            total = manager._stream_entities(CurriculumUnit, iter_json_array(file, "curriculum_units"))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert total == UNITS
+    assert manager.sync_dao.rows == UNITS
+    assert manager.sync_dao.chunks == -(-UNITS // settings.SYNC_STREAM_CHUNK_SIZE)
+    assert peak / 2 ** 20 < MEMORY_BUDGET_MIB, f"peak {peak / 2 ** 20:.1f} MiB"
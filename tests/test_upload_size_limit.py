@@ -0,0 +1,24 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.api.middleware import FORM_FIELDS_ALLOWANCE
+from app.config.config import settings
+from main import get_app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE_BYTES", 1024)
+    return TestClient(get_app())
+
+
+def test_too_large_upload_gets_cors_headers(client):
+    body = b"x" * (1024 + FORM_FIELDS_ALLOWANCE + 1)
+
+    response = client.post(
+        "/articles",
+        content=body,
+        headers={"Origin": "https://piit.example", "Content-Type": "multipart/form-data; boundary=b"},
+    )
+
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == "*"